@@ -1,12 +1,84 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import logs, analysis, alerts
+from app.routes import logs, analysis, alerts, stream
+from app.services.opensearch_client import opensearch_client, ingest_buffer
+from app.services.anomaly_detector import anomaly_detector
+from app.services.predictor import predictor
+from app.services.llm_agent import llm_agent
+from app.services.inference import inference_service
+from app.services.health import health_checker
+from app.services.rca_jobs import rca_jobs
+from app.services.alert_outbox import alert_outbox
+from app.services.alert_aggregator import alert_aggregator
+from app.services.log_stream import log_broadcaster
+from app.services.notifier import notifier
+from app.utils.readiness import readiness
 from app.utils.config import settings
 
+async def connect_opensearch():
+    """Connect to OpenSearch, retrying with backoff until it is reachable"""
+    readiness.warming("opensearch")
+    delay = 1.0
+    while not await opensearch_client.connect():
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+    readiness.ready("opensearch")
+
+async def warm_model(name: str, load):
+    """Load a model on a worker thread and record how long it took"""
+    readiness.warming(name)
+    try:
+        await asyncio.to_thread(load)
+        readiness.ready(name)
+    except Exception as e:
+        readiness.failed(name, str(e))
+
+async def warm_models():
+    """Load models one after another so they do not compete for CPU"""
+    await warm_model("anomaly_detector", anomaly_detector.ensure_loaded)
+    await warm_model("predictor", predictor.ensure_loaded)
+    await warm_model("llm_agent", llm_agent.ensure_loaded)
+
+async def warm_up():
+    """Bring subsystems up in the background so the API serves immediately"""
+    tasks = [connect_opensearch()]
+    if settings.WARMUP_MODELS:
+        tasks.append(warm_models())
+    await asyncio.gather(*tasks)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background workers on startup and drain them on shutdown"""
+    for name in ["opensearch", "anomaly_detector", "predictor", "llm_agent"]:
+        readiness.register(name)
+    
+    if settings.ANOMALY_SCORE_AT_INGEST:
+        ingest_buffer.add_processor(inference_service.annotate_if_ready)
+    ingest_buffer.add_listener(log_broadcaster.publish_indexed)
+    if settings.INGEST_BUFFER_ENABLED:
+        await ingest_buffer.start()
+    await rca_jobs.start()
+    await alert_outbox.start()
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    await rca_jobs.stop()
+    # Pending digests go into the outbox before it closes
+    await alert_aggregator.stop()
+    await alert_outbox.stop()
+    await notifier.close()
+    await ingest_buffer.stop()
+    await inference_service.close()
+    await opensearch_client.close()
+
 app = FastAPI(
     title="AI DevOps Monitor",
     description="AI-powered DevOps monitoring and anomaly detection system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -22,6 +94,7 @@ app.add_middleware(
 app.include_router(logs.router, prefix="/logs", tags=["logs"])
 app.include_router(analysis.router, prefix="/analysis", tags=["analysis"])
 app.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+app.include_router(stream.router, prefix="/ws", tags=["live"])
 
 @app.get("/")
 async def health_check():
@@ -35,8 +108,22 @@ async def health_check():
 @app.get("/health")
 async def health():
     """Detailed health check"""
+    report = await health_checker.check()
     return {
-        "status": "ok",
-        "opensearch": "connected",
-        "llm": "ready"
+        "status": "ok" if report["status"] == "ready" else report["status"],
+        "opensearch": "connected" if report["dependencies"]["opensearch"]["status"] == "up" else "disconnected",
+        "llm": "ready" if "rca_rule_based_fallback" not in report["degraded"] else "unavailable",
+        "degraded": report["degraded"],
+        "startup": report["startup"]
     }
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process and event loop are responsive"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_probe():
+    """Readiness probe: 200 when OpenSearch is reachable, 503 otherwise"""
+    report = await health_checker.check()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
-from app.services.notifier import notifier
+from typing import Optional, Dict, Any
+from app.services.alert_outbox import alert_outbox
+from app.services.alert_aggregator import alert_aggregator
 
 router = APIRouter()
 
@@ -11,10 +12,38 @@ class AlertMessage(BaseModel):
     severity: str = "info"
     service: Optional[str] = None
 
+async def _submit(alert: Dict[str, Any], message: str) -> Dict[str, Any]:
+    """Pass an alert through dedup and rate limiting and describe what happened"""
+    result = await alert_aggregator.submit(alert)
+    record = result["record"]
+    
+    if result["action"] == "merged":
+        return {
+            "status": "merged",
+            "message": "Duplicate alert merged into the next digest",
+            "alert_id": None,
+            "digest_at": result["digest_at"]
+        }
+    if result["action"] == "dropped":
+        return {
+            "status": "dropped",
+            "message": "Alert dropped: channel rate limit reached",
+            "alert_id": None,
+            "dropped_channels": result["dropped_channels"]
+        }
+    return {
+        "status": "queued",
+        "message": message,
+        "alert_id": record["alert_id"],
+        "channels": {channel: state["status"] for channel, state in record["channels"].items()},
+        "dropped_channels": result["dropped_channels"]
+    }
+
 @router.post("/test")
 async def send_test_alert():
     """
-    Send a test alert via configured channels
+    Send a test alert via configured channels, bypassing deduplication
+    Returns at once; poll /alerts/{alert_id} for delivery status
     """
     try:
         alert = {
@@ -23,12 +52,13 @@ async def send_test_alert():
             "severity": "info"
         }
         
-        results = notifier.send_alert(alert)
+        record = await alert_outbox.enqueue(alert)
         
         return {
-            "status": "success",
-            "message": "Test alert sent",
-            "channels": results
+            "status": "queued",
+            "message": "Test alert queued",
+            "alert_id": record["alert_id"],
+            "channels": {channel: state["status"] for channel, state in record["channels"].items()}
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send alert: {str(e)}")
@@ -37,15 +67,11 @@ async def send_test_alert():
 async def send_alert(alert: AlertMessage):
     """
     Send custom alert via configured channels
+    Repeats within the dedup window are merged into a digest
+    Returns at once; poll /alerts/{alert_id} for delivery status
     """
     try:
-        results = notifier.send_alert(alert.dict())
-        
-        return {
-            "status": "success",
-            "message": "Alert sent successfully",
-            "channels": results
-        }
+        return await _submit(alert.dict(), "Alert queued for delivery")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send alert: {str(e)}")
 
@@ -61,13 +87,7 @@ async def send_anomaly_alert(log_id: str, anomaly_score: float):
             "severity": "warning"
         }
         
-        results = notifier.send_alert(alert)
-        
-        return {
-            "status": "success",
-            "message": "Anomaly alert sent",
-            "channels": results
-        }
+        return await _submit(alert, "Anomaly alert queued")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to send anomaly alert: {str(e)}")
 
@@ -84,12 +104,30 @@ async def send_failure_alert(service: str, probability: float):
             "service": service
         }
         
-        results = notifier.send_alert(alert)
-        
+        return await _submit(alert, "Failure alert queued")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to send failure alert: {str(e)}")
+
+@router.get("/outbox")
+async def get_outbox_stats():
+    """
+    Alerts per delivery status, outbox counters and dedup/rate-limit counters
+    """
+    try:
         return {
             "status": "success",
-            "message": "Failure alert sent",
-            "channels": results
+            "outbox": await alert_outbox.get_stats(),
+            "dedup": alert_aggregator.get_stats()
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send failure alert: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get outbox stats: {str(e)}")
+
+@router.get("/{alert_id}")
+async def get_alert_status(alert_id: str):
+    """
+    Delivery status of a queued alert, per channel
+    """
+    record = await alert_outbox.get(alert_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return record
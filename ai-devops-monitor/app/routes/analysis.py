@@ -1,17 +1,46 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple, Literal
+import asyncio
+import json
+import time
 from app.services.anomaly_detector import anomaly_detector
-from app.services.predictor import predictor
-from app.services.llm_agent import llm_agent
+from app.services.llm_agent import llm_agent, PROMPT_FIELDS
+from app.services.predictor import LOG_FIELDS as PREDICT_FIELDS
 from app.services.opensearch_client import opensearch_client
+from app.services.inference import inference_service
+from app.services.rca_jobs import rca_jobs, QueueFullError
+from app.utils.config import settings
 
 router = APIRouter()
 
+# Latest logs per service that a failure prediction is based on
+PREDICT_LOG_WINDOW = 100
+
+# Recent summaries keyed by (hours, interval, service), shared by all dashboard clients
+_summary_cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+_summary_lock = asyncio.Lock()
+
+# Background task storing and backfilling lazily computed anomaly scores
+_backfill_task: Optional[asyncio.Task] = None
+_store_tasks: Set[asyncio.Task] = set()
+
 class AnalysisRequest(BaseModel):
     log_ids: List[str]
     context: str = ""
 
+class RCAJobRequest(AnalysisRequest):
+    priority: Literal["interactive", "batch"] = "interactive"
+
+async def _fetch_logs(log_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Fetch the selected logs in one multi-get, returning (logs, missing ids)"""
+    return await opensearch_client.get_logs_by_ids(log_ids, fields=list(PROMPT_FIELDS))
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.post("/rca")
 async def root_cause_analysis(request: AnalysisRequest):
     """
@@ -19,54 +48,250 @@ async def root_cause_analysis(request: AnalysisRequest):
     """
     try:
         # Fetch logs from OpenSearch
-        logs = []
-        for log_id in request.log_ids:
-            log = opensearch_client.get_log_by_id(log_id)
-            if log:
-                logs.append(log)
+        logs, missing_ids = await _fetch_logs(request.log_ids)
         
         if not logs:
             raise HTTPException(status_code=404, detail="No logs found")
         
-        # Run LLM analysis
-        analysis = llm_agent.analyze_logs(logs, context=request.context)
+        # Run LLM analysis on the bounded worker pool, reusing a recent identical one
+        try:
+            analysis, cached = await rca_jobs.analyze(logs, context=request.context)
+        except QueueFullError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except RuntimeError as e:
+            # The job failed; answer with the rule-based analysis as the LLM path does
+            print(f"RCA job failed, using rule-based analysis: {e}")
+            analysis, cached = llm_agent.fallback_analysis(logs), False
         
         return {
             "status": "success",
             "analysis": analysis,
-            "logs_analyzed": len(logs)
+            "logs_analyzed": len(logs),
+            "missing_ids": missing_ids,
+            "cached": cached
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@router.post("/rca/stream")
+async def root_cause_analysis_stream(request: AnalysisRequest):
+    """
+    Root cause analysis streamed as Server-Sent Events while the LLM generates it
+    Events: meta (logs_analyzed, missing_ids, cached), token (text), done, error (detail)
+    """
+    try:
+        logs, missing_ids = await _fetch_logs(request.log_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    
+    if not logs:
+        raise HTTPException(status_code=404, detail="No logs found")
+    
+    async def events():
+        release = None
+        try:
+            # Generations share the RCA worker pool; cached answers do not need a slot
+            if llm_agent.cached_analysis(logs, request.context) is None:
+                _, release = await rca_jobs.acquire_slot("interactive")
+            async for kind, payload in llm_agent.stream_analysis(logs, context=request.context):
+                if kind == "meta":
+                    yield _sse("meta", {"logs_analyzed": len(logs), "missing_ids": missing_ids, **payload})
+                else:
+                    yield _sse("token", {"text": payload})
+            yield _sse("done", {})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Analysis failed: {str(e)}"})
+        finally:
+            if release is not None:
+                release.set()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies such as nginx from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/rca/jobs", status_code=202)
+async def submit_rca_job(request: RCAJobRequest):
+    """
+    Queue a root cause analysis and return its job id for polling
+    Interactive jobs run before batch jobs
+    """
+    try:
+        logs, missing_ids = await _fetch_logs(request.log_ids)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue analysis: {str(e)}")
+    
+    if not logs:
+        raise HTTPException(status_code=404, detail="No logs found")
+    
+    try:
+        job = rca_jobs.submit_analysis(logs, request.context, request.priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return {**job.to_dict(), "missing_ids": missing_ids}
+
+@router.get("/rca/jobs/{job_id}")
+async def get_rca_job(job_id: str):
+    """
+    Job status, and the analysis once it has completed
+    """
+    job = rca_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/rca/queue")
+async def get_rca_queue():
+    """
+    RCA worker pool metrics: queue depth, running jobs, wait and run times
+    """
+    return {
+        "status": "success",
+        "queue": rca_jobs.get_stats(),
+        "cache": llm_agent.get_cache_stats()
+    }
+
+def _score_fields(logs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {
+        log["_id"]: {
+            "anomaly_score": log["anomaly_score"],
+            "is_anomaly": log["is_anomaly"],
+            "anomaly_model": log["anomaly_model"]
+        }
+        for log in logs if "anomaly_model" in log
+    }
+
+async def _backfill_scores(page: List[Dict[str, Any]], hours: Optional[int], page_only: bool = False):
+    """Store the scores computed for a page, then score a batch of older unscored logs"""
+    try:
+        if page:
+            await opensearch_client.update_logs(_score_fields(page))
+        if page_only:
+            return
+        unscored = await opensearch_client.search_unscored_logs(
+            anomaly_detector.model_version,
+            limit=settings.ANOMALY_LAZY_SCORE_LIMIT,
+            hours=hours
+        )
+        if await inference_service.annotate(unscored):
+            await opensearch_client.update_logs(_score_fields(unscored))
+    except Exception as e:
+        print(f"Anomaly score backfill failed: {e}")
+
+def _schedule_backfill(page: List[Dict[str, Any]], hours: Optional[int]):
+    """Run one backfill at a time; polls while one is running only store their page"""
+    global _backfill_task
+    if _backfill_task is not None and not _backfill_task.done():
+        if page:
+            task = asyncio.create_task(_backfill_scores(page, hours, page_only=True))
+            _store_tasks.add(task)
+            task.add_done_callback(_store_tasks.discard)
+        return
+    _backfill_task = asyncio.create_task(_backfill_scores(page, hours))
+
 @router.get("/anomalies")
-async def get_anomalies(limit: int = 100):
+async def get_anomalies(limit: int = 100, hours: Optional[int] = None, service: Optional[str] = None):
     """
-    Detect and return anomalies in recent logs
+    Return the highest-scoring anomalies, optionally within the last `hours`
+    Scores are stored at ingest. Up to `limit` of the newest logs the current model
+    has not scored are scored for this response; storing them and scoring older
+    logs happens in the background.
+    total_logs counts the logs in the window that have a stored score.
     """
     try:
-        # Get recent logs
-        logs = opensearch_client.search_logs(limit=limit)
+        page = await opensearch_client.search_unscored_logs(
+            anomaly_detector.model_version,
+            limit=min(limit, settings.ANOMALY_LAZY_SCORE_LIMIT),
+            hours=hours,
+            service=service
+        )
+        previously_scored = sum(1 for log in page if "anomaly_score" in log)
+        previously_anomalous = sum(1 for log in page if log.get("is_anomaly"))
+        if not await inference_service.annotate(page):
+            page = []
         
-        # Detect anomalies
-        anomalies = []
-        for log in logs:
-            is_anomaly, score = anomaly_detector.detect_anomaly(log)
-            if is_anomaly:
-                anomalies.append({
-                    "log": log,
-                    "anomaly_score": score
-                })
+        # Query the stored scores
+        result = await opensearch_client.search_anomalies(limit=limit, hours=hours, service=service)
+        _schedule_backfill(page, hours)
+        
+        # Freshly scored logs replace their stored (older model) versions
+        fresh = {log["_id"]: log for log in page}
+        logs = [log for log in page if log["is_anomaly"]]
+        logs += [log for log in result["logs"] if log["_id"] not in fresh]
+        logs.sort(key=lambda log: log.get("anomaly_score", 0.0), reverse=True)
+        anomalies = [
+            {"log": log, "anomaly_score": log.get("anomaly_score", 0.0)}
+            for log in logs[:limit]
+        ]
+        
+        total_anomalies = result["total_anomalies"]
+        total_scored = result["total_scored"]
+        if page:
+            total_anomalies += sum(1 for log in page if log["is_anomaly"]) - previously_anomalous
+            total_scored += len(page) - previously_scored
         
         return {
             "status": "success",
-            "total_logs": len(logs),
-            "anomalies_detected": len(anomalies),
+            "total_logs": total_scored,
+            "anomalies_detected": total_anomalies,
             "anomalies": anomalies
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Anomaly detection failed: {str(e)}")
 
+@router.get("/summary")
+async def get_summary(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    interval: Optional[int] = Query(None, ge=1, description="Histogram bucket size in minutes"),
+    service: Optional[str] = None
+):
+    """
+    Log counts per level and service plus an error-rate histogram over the last `hours`
+    Computed by one OpenSearch aggregation and cached for a few seconds
+    """
+    # Default to roughly 48 buckets across the range
+    interval = interval or max(1, hours * 60 // 48)
+    # Keep the histogram bounded regardless of the requested interval
+    interval = max(interval, hours * 60 // 500)
+    key = (hours, interval, service)
+    
+    try:
+        cached = _summary_cache.get(key)
+        if cached and time.monotonic() - cached[0] < settings.SUMMARY_CACHE_TTL:
+            return cached[1]
+        
+        async with _summary_lock:
+            # Another request may have refreshed it while we waited
+            cached = _summary_cache.get(key)
+            if cached and time.monotonic() - cached[0] < settings.SUMMARY_CACHE_TTL:
+                return cached[1]
+            
+            summary = await opensearch_client.get_summary(
+                hours=hours,
+                interval_minutes=interval,
+                service=service
+            )
+            result = {
+                "status": "success",
+                "hours": hours,
+                "interval_minutes": interval,
+                **summary
+            }
+            
+            # Drop expired entries so odd parameter combinations do not accumulate
+            now = time.monotonic()
+            for stale in [k for k, (at, _) in _summary_cache.items() if now - at >= settings.SUMMARY_CACHE_TTL]:
+                del _summary_cache[stale]
+            _summary_cache[key] = (now, result)
+            return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Summary failed: {str(e)}")
+
 @router.get("/predict")
 async def predict_failure(service: str = None):
     """
@@ -74,7 +299,7 @@ async def predict_failure(service: str = None):
     """
     try:
         # Get recent logs for service
-        logs = opensearch_client.search_logs(limit=100, service=service)
+        logs = await opensearch_client.search_logs(limit=PREDICT_LOG_WINDOW, service=service)
         
         if not logs:
             return {
@@ -84,7 +309,7 @@ async def predict_failure(service: str = None):
             }
         
         # Run prediction
-        prediction = predictor.predict_failure(logs)
+        prediction = await inference_service.predict_failure(logs)
         
         return {
             "status": "success",
@@ -96,29 +321,78 @@ async def predict_failure(service: str = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@router.get("/predict/all")
+async def predict_all_services(
+    hours: int = Query(1, ge=1, le=24 * 7),
+    max_services: int = Query(500, ge=1, le=5000)
+):
+    """
+    Rank every service that logged in the last `hours` by failure risk
+    Each service is scored on its latest logs, the same window /predict uses,
+    fetched with one _msearch and scored in a single model call
+    """
+    try:
+        services = await opensearch_client.get_active_services(hours=hours, max_services=max_services)
+        if not services:
+            return {
+                "status": "success",
+                "hours": hours,
+                "services_analyzed": 0,
+                "predictions": []
+            }
+        
+        logs_by_service = await opensearch_client.search_logs_by_service(
+            services, limit=PREDICT_LOG_WINDOW, fields=list(PREDICT_FIELDS)
+        )
+        predictions = await inference_service.predict_failures(
+            [logs_by_service.get(service, []) for service in services]
+        )
+        
+        ranking = sorted(
+            (
+                {"service": service, **prediction}
+                for service, prediction in zip(services, predictions)
+            ),
+            key=lambda p: p["probability"],
+            reverse=True
+        )
+        
+        return {
+            "status": "success",
+            "hours": hours,
+            "services_analyzed": len(ranking),
+            "predictions": ranking
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Fleet prediction failed: {str(e)}")
+
 @router.post("/batch-analyze")
 async def batch_analyze():
     """
     Run full analysis pipeline on recent logs
     """
     try:
-        logs = opensearch_client.search_logs(limit=200)
+        logs = await opensearch_client.search_logs(limit=200)
         
         # Detect anomalies
         anomalies = []
-        for log in logs:
-            is_anomaly, score = anomaly_detector.detect_anomaly(log)
+        for log, (is_anomaly, score) in zip(logs, await inference_service.get_scores(logs)):
             if is_anomaly:
                 anomalies.append({"log": log, "score": score})
         
         # Predict failures
-        prediction = predictor.predict_failure(logs)
+        prediction = await inference_service.predict_failure(logs)
         
         # Generate insights if anomalies found
         insights = None
         if anomalies:
             top_anomalies = sorted(anomalies, key=lambda x: x["score"], reverse=True)[:5]
-            insights = llm_agent.analyze_logs([a["log"] for a in top_anomalies])
+            top_logs = [a["log"] for a in top_anomalies]
+            try:
+                insights, _ = await rca_jobs.analyze(top_logs, priority="batch")
+            except RuntimeError as e:
+                print(f"RCA job failed, using rule-based analysis: {e}")
+                insights = llm_agent.fallback_analysis(top_logs)
         
         return {
             "status": "success",
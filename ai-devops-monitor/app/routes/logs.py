@@ -1,24 +1,33 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
-from app.services.opensearch_client import opensearch_client
-from app.utils.preprocess import preprocess_log
+import json
+from app.services.opensearch_client import opensearch_client, ingest_buffer, IngestUnavailableError
+from app.services.inference import inference_service
+from app.services.log_stream import log_broadcaster
+from app.utils.preprocess import preprocess_log, preprocess_logs, template_miner
+from app.utils.config import settings
 
 router = APIRouter()
 
 class LogEntry(BaseModel):
-    timestamp: Optional[str] = None
+    timestamp: Optional[Union[str, float]] = None
     level: str
     service: str
     message: str
     metadata: Optional[Dict[str, Any]] = None
 
 @router.post("/")
-async def ingest_log(log: LogEntry):
+async def ingest_log(log: LogEntry, ack: Optional[str] = None):
     """
     Ingest a log entry, preprocess it, and store in OpenSearch
+    ack=queued returns once the log is buffered, ack=durable once it is written
     """
+    ack = ack or settings.INGEST_DEFAULT_ACK
+    if ack not in ("queued", "durable"):
+        raise HTTPException(status_code=400, detail="ack must be 'queued' or 'durable'")
+    
     try:
         # Add timestamp if not provided
         if not log.timestamp:
@@ -27,24 +36,120 @@ async def ingest_log(log: LogEntry):
         # Preprocess log
         processed_log = preprocess_log(log.dict())
         
-        # Index in OpenSearch
-        result = opensearch_client.index_log(processed_log)
+        if settings.INGEST_BUFFER_ENABLED and ingest_buffer.running:
+            # Hand off to the micro-batching buffer
+            log_id = await ingest_buffer.submit(processed_log, wait=(ack == "durable"))
+        else:
+            if settings.ANOMALY_SCORE_AT_INGEST:
+                await inference_service.annotate_if_ready([processed_log])
+            
+            # Index in OpenSearch
+            result = await opensearch_client.index_log(processed_log)
+            log_id = result.get("_id")
+            log_broadcaster.publish_indexed([processed_log], [result])
+            ack = "durable"
         
         return {
             "status": "success",
-            "log_id": result.get("_id"),
+            "log_id": log_id,
+            "ack": ack,
             "message": "Log ingested successfully"
         }
+    except IngestUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Failed to ingest log: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to ingest log: {str(e)}")
 
+def _parse_bulk_body(raw: bytes, content_type: str) -> List[Any]:
+    """Parse a bulk ingest body given as a JSON array or NDJSON"""
+    text = raw.decode("utf-8").strip()
+    if not text:
+        return []
+    
+    if "ndjson" not in content_type and text.startswith("["):
+        entries = json.loads(text)
+        if not isinstance(entries, list):
+            raise ValueError("expected a JSON array of log entries")
+        return entries
+    
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+@router.post("/bulk")
+async def ingest_logs_bulk(request: Request):
+    """
+    Ingest a batch of log entries (JSON array or NDJSON) via the _bulk API
+    Returns per-item ids and errors so failed items can be retried
+    """
+    try:
+        entries = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk body: {str(e)}")
+    
+    if len(entries) > settings.INGEST_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Bulk request exceeds {settings.INGEST_BULK_MAX_ITEMS} items"
+        )
+    
+    try:
+        items: List[Dict[str, Any]] = [{"index": i} for i in range(len(entries))]
+        valid_positions = []
+        valid_logs = []
+        
+        for i, entry in enumerate(entries):
+            try:
+                if not isinstance(entry, dict):
+                    raise ValueError("log entry must be a JSON object")
+                log = LogEntry(**entry)
+            except (ValidationError, ValueError, TypeError) as e:
+                items[i].update({"status": "error", "log_id": None, "error": str(e)})
+                continue
+            
+            if not log.timestamp:
+                log.timestamp = datetime.utcnow().isoformat()
+            
+            valid_positions.append(i)
+            valid_logs.append(log.dict())
+        
+        # Preprocess, score and index in OpenSearch
+        processed_logs = preprocess_logs(valid_logs)
+        if settings.ANOMALY_SCORE_AT_INGEST:
+            await inference_service.annotate_if_ready(processed_logs)
+        results = await opensearch_client.index_logs(processed_logs)
+        log_broadcaster.publish_indexed(processed_logs, results)
+        
+        for i, result in zip(valid_positions, results):
+            if result.get("error"):
+                items[i].update({"status": "error", "log_id": None, "error": result["error"]})
+            else:
+                items[i].update({"status": "success", "log_id": result.get("_id"), "error": None})
+        
+        failed = sum(1 for item in items if item["status"] == "error")
+        ingested = len(items) - failed
+        
+        if not failed:
+            status = "success"
+        elif ingested:
+            status = "partial"
+        else:
+            status = "error"
+        
+        return {
+            "status": status,
+            "ingested": ingested,
+            "failed": failed,
+            "items": items
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to ingest logs: {str(e)}")
+
 @router.get("/")
 async def get_logs(limit: int = 100, level: Optional[str] = None):
     """
     Retrieve logs from OpenSearch with optional filtering
     """
     try:
-        logs = opensearch_client.search_logs(limit=limit, level=level)
+        logs = await opensearch_client.search_logs(limit=limit, level=level)
         return {
             "status": "success",
             "count": len(logs),
@@ -53,13 +158,41 @@ async def get_logs(limit: int = 100, level: Optional[str] = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve logs: {str(e)}")
 
+@router.get("/live")
+async def get_live_tail_stats():
+    """
+    Live tail (/ws/logs) clients and fan-out counters
+    """
+    return {
+        "status": "success",
+        "live_tail": log_broadcaster.get_stats()
+    }
+
+@router.get("/templates")
+async def get_templates(limit: int = 50, level: Optional[str] = None, service: Optional[str] = None):
+    """
+    Return log counts per mined message template
+    Counts stored under an id the template had before it widened are folded into its current id
+    """
+    try:
+        # Fetch extra buckets so merging old ids still leaves `limit` templates
+        templates = await opensearch_client.get_template_counts(limit=limit * 2, level=level, service=service)
+        templates = template_miner.merge_counts(templates)[:limit]
+        return {
+            "status": "success",
+            "count": len(templates),
+            "templates": templates
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve templates: {str(e)}")
+
 @router.get("/search")
 async def search_logs(query: str, limit: int = 50):
     """
     Search logs by text query
     """
     try:
-        logs = opensearch_client.search_logs(query=query, limit=limit)
+        logs = await opensearch_client.search_logs(query=query, limit=limit)
         return {
             "status": "success",
             "query": query,
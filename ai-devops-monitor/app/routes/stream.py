@@ -0,0 +1,57 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Optional
+import asyncio
+import json
+from app.services.log_stream import log_broadcaster
+
+router = APIRouter()
+
+@router.websocket("/logs")
+async def live_tail(websocket: WebSocket, level: Optional[str] = None, service: Optional[str] = None):
+    """
+    Push logs to the client as they are ingested
+    level and service filter server-side (comma-separated); send
+    {"level": ..., "service": ...} to change them without reconnecting
+    """
+    await websocket.accept()
+    try:
+        subscriber = log_broadcaster.subscribe(level, service)
+    except ConnectionRefusedError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+    
+    def acknowledge():
+        try:
+            subscriber.queue.put_nowait({"type": "subscribed", "filters": subscriber.filters})
+        except asyncio.QueueFull:
+            pass
+    
+    async def send_messages():
+        # The only task that writes to the socket
+        while True:
+            message = await subscriber.queue.get()
+            if message is None:
+                await websocket.close(code=1013, reason="Client too slow, dropped from live tail")
+                return
+            if isinstance(message, list):
+                message = {"type": "logs", "logs": message}
+            await websocket.send_json(message)
+    
+    acknowledge()
+    sender = asyncio.create_task(send_messages())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                filters = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(filters, dict):
+                subscriber.set_filters(filters.get("level"), filters.get("service"))
+                acknowledge()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        log_broadcaster.unsubscribe(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from app.services.alert_outbox import alert_outbox
+from app.services.notifier import notifier
+from app.utils.config import settings
+
+class TokenBucket:
+    """Allows `burst` sends at once, refilled at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return round(self.tokens, 2)
+
+class AlertAggregator:
+    """
+    Deduplicates alerts before they reach the outbox
+
+    Alerts are keyed by (service, severity, title). The first alert for a
+    key is sent at once and opens a coalescing window of ALERT_DEDUP_WINDOW
+    seconds; repeats inside the window are merged, and when it closes a
+    single digest with their count is sent and a new window starts. A key
+    whose window closes with nothing merged is forgotten.
+
+    Each channel also has a token bucket; a channel that has run out of
+    tokens is skipped for that alert and counted as dropped. A digest that
+    no channel has tokens for is held back and its count carried into the
+    next window instead.
+    """
+
+    def __init__(self):
+        self.window = settings.ALERT_DEDUP_WINDOW
+        self.buckets = {
+            channel: TokenBucket(settings.ALERT_RATE_LIMIT_PER_MINUTE, settings.ALERT_RATE_BURST)
+            for channel in ("slack", "email")
+        }
+        self._windows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.stats = {"received": 0, "sent": 0, "merged": 0, "digests": 0, "deferred_digests": 0, "dropped": 0}
+        self.dropped_by_channel = {channel: 0 for channel in self.buckets}
+
+    @staticmethod
+    def key(alert: Dict[str, Any]) -> Tuple[str, str, str]:
+        return (
+            alert.get("service") or "",
+            str(alert.get("severity", "info")).lower(),
+            alert.get("title", "")
+        )
+
+    async def submit(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send or merge an alert
+        Returns the action taken (sent, merged or dropped) and the outbox record if sent
+        """
+        self.stats["received"] += 1
+        if self.window <= 0:
+            return await self._send(alert)
+
+        key = self.key(alert)
+        window = self._windows.get(key)
+        now = time.time()
+        if window is not None:
+            window["merged"] += 1
+            window["last_message"] = alert.get("message", "")
+            self.stats["merged"] += 1
+            return {"action": "merged", "record": None, "digest_at": window["closes_at"]}
+
+        # Open the window before sending so concurrent repeats merge into it
+        self._open_window(key, alert, now)
+        return await self._send(alert)
+
+    def _open_window(self, key: Tuple[str, str, str], alert: Dict[str, Any], now: float, carried: Optional[Dict[str, Any]] = None):
+        loop = asyncio.get_running_loop()
+        carried = carried or {}
+        self._windows[key] = {
+            "alert": alert,
+            "merged": carried.get("merged", 0),
+            "last_message": carried.get("last_message"),
+            "opened_at": carried.get("opened_at", now),
+            "closes_at": now + self.window,
+            "handle": loop.call_later(self.window, self._schedule_close, key)
+        }
+
+    def _schedule_close(self, key: Tuple[str, str, str]):
+        task = asyncio.create_task(self._close_window(key))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_window(self, key: Tuple[str, str, str]):
+        window = self._windows.pop(key, None)
+        if window is None or window["merged"] == 0:
+            return
+        
+        if not self._has_tokens():
+            # Rate limited: fold this window's count into the next digest
+            self.stats["deferred_digests"] += 1
+            self._open_window(key, window["alert"], time.time(), carried=window)
+            return
+        
+        # The incident may still be going on: keep coalescing into the next digest
+        self._open_window(key, window["alert"], time.time())
+        try:
+            await self._send(self._digest(window))
+            self.stats["digests"] += 1
+        except Exception as e:
+            print(f"Alert digest for '{window['alert'].get('title')}' could not be queued: {e}")
+
+    def _digest(self, window: Dict[str, Any]) -> Dict[str, Any]:
+        alert = window["alert"]
+        minutes = max(round((time.time() - window["opened_at"]) / 60), 1)
+        latest = window["last_message"] or alert.get("message", "")
+        return {
+            **{field: alert[field] for field in ("severity", "service") if alert.get(field)},
+            "title": f"{alert.get('title', 'DevOps Alert')} (digest)",
+            "message": (
+                f"{window['merged']} more alert(s) like this in the last {minutes} min. "
+                f"Latest: {latest}"
+            ),
+            "digest_count": window["merged"]
+        }
+
+    def _has_tokens(self) -> bool:
+        channels = notifier.channels()
+        return not channels or any(self.buckets[channel].available >= 1 for channel in channels)
+
+    async def _send(self, alert: Dict[str, Any]) -> Dict[str, Any]:
+        channels = []
+        dropped = []
+        for channel in notifier.channels():
+            if self.buckets[channel].take():
+                channels.append(channel)
+            else:
+                dropped.append(channel)
+                self.dropped_by_channel[channel] += 1
+
+        if dropped and not channels:
+            self.stats["dropped"] += 1
+            print(f"Alert '{alert.get('title')}' dropped: rate limit reached for {', '.join(dropped)}")
+            return {"action": "dropped", "record": None, "dropped_channels": dropped}
+
+        self.stats["sent"] += 1
+        record = await alert_outbox.enqueue(alert, channels=channels)
+        return {"action": "sent", "record": record, "dropped_channels": dropped}
+
+    async def stop(self):
+        """Queue any pending digests now rather than losing their counts"""
+        # Let digests already being queued finish
+        await asyncio.gather(*self._closing, return_exceptions=True)
+        for key in list(self._windows):
+            window = self._windows.pop(key)
+            window["handle"].cancel()
+            if window["merged"]:
+                # Shutting down: the outbox persists these, so skip the rate limit
+                await alert_outbox.enqueue(self._digest(window))
+                self.stats["digests"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window,
+            "open_windows": len(self._windows),
+            **self.stats,
+            "dropped_by_channel": dict(self.dropped_by_channel),
+            "tokens_available": {channel: bucket.available for channel, bucket in self.buckets.items()}
+        }
+
+# Singleton instance
+alert_aggregator = AlertAggregator()
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+from app.services.notifier import notifier
+from app.utils.config import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    alert TEXT NOT NULL,
+    status TEXT NOT NULL,
+    channels TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS alerts_due ON alerts (status, next_attempt_at);
+"""
+
+# Channel states that still need a delivery attempt
+OPEN_STATES = ("pending", "retrying")
+# Alert states the retention sweep must leave alone
+ACTIVE_STATES = ("pending", "sending")
+
+class AlertOutbox:
+    """
+    Persisted queue of alerts awaiting delivery
+
+    Enqueueing writes the alert to a SQLite file and returns at once; a
+    background worker sends each alert to its channels concurrently and
+    retries failed channels with exponential backoff up to
+    ALERT_MAX_ATTEMPTS. Alerts still open when the process stops are sent
+    after restart, so delivery is at least once.
+
+    Several workers may share the file: a worker claims a due alert by
+    moving it from pending to sending with a lease of ALERT_LEASE_SECONDS,
+    and only the worker whose claim succeeded sends it. Leases left behind
+    by a worker that died are returned to pending once they expire.
+
+    All SQLite work runs on one dedicated thread, so a busy database file
+    never blocks the event loop.
+    """
+
+    def __init__(self):
+        self.path = settings.ALERT_OUTBOX_PATH
+        self.max_attempts = settings.ALERT_MAX_ATTEMPTS
+        self.base_delay = settings.ALERT_RETRY_BASE_DELAY
+        self.max_delay = settings.ALERT_RETRY_MAX_DELAY
+        self.concurrency = settings.ALERT_OUTBOX_CONCURRENCY
+        self.retention = settings.ALERT_RETENTION
+        self.lease = settings.ALERT_LEASE_SECONDS
+        self.busy_timeout = settings.ALERT_OUTBOX_BUSY_TIMEOUT
+        # One thread owns the connection and runs every query
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-outbox")
+        self._db: Optional[sqlite3.Connection] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._last_prune = 0.0
+        self.stats = {"queued": 0, "delivered": 0, "retried": 0, "failed": 0, "reclaimed": 0}
+
+    async def start(self):
+        """Open the outbox and resume delivering anything left from a previous run"""
+        await self._ensure_started()
+        await self._call(self._reclaim)
+
+    async def _ensure_started(self):
+        await self._call(self._open)
+        if self._worker is None or self._worker.done():
+            self._wake = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _call(self, fn: Callable, *args):
+        """Run a database function on the outbox thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _open(self):
+        if self._db is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Wait for other workers' write locks instead of failing at once
+        self._db = sqlite3.connect(self.path, timeout=self.busy_timeout)
+        self._db.row_factory = sqlite3.Row
+        # WAL keeps commits cheap enough to run on the event loop
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(alerts)")}
+        if "lease_until" not in columns:
+            # Outbox files created before leases were added
+            self._db.execute("ALTER TABLE alerts ADD COLUMN lease_until REAL")
+        self._db.commit()
+
+    async def stop(self):
+        """Stop the worker; interrupted deliveries stay queued for the next start"""
+        tasks = [t for t in [self._worker, *self._tasks] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+        self._tasks.clear()
+        try:
+            await self._call(self._close, list(self._inflight))
+        except Exception as e:
+            print(f"Alert outbox close error: {e}")
+        self._inflight.clear()
+
+    def _close(self, inflight: List[str]):
+        if self._db is None:
+            return
+        try:
+            if inflight:
+                # Hand our claims back rather than waiting for the leases to expire
+                self._db.executemany(
+                    "UPDATE alerts SET status = 'pending', lease_until = NULL WHERE id = ? AND status = 'sending'",
+                    [(alert_id,) for alert_id in inflight]
+                )
+                self._db.commit()
+        finally:
+            self._db.close()
+            self._db = None
+
+    async def enqueue(self, alert: Dict[str, Any], channels: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Persist an alert for delivery and return its record
+        channels defaults to every configured channel
+        """
+        await self._ensure_started()
+        alert = dict(alert)
+        # Slack shows when the alert was raised, not when a retry got through
+        alert.setdefault("timestamp", time.time())
+
+        now = time.time()
+        if channels is None:
+            channels = notifier.channels()
+        channels = {
+            channel: {"status": "pending", "attempts": 0, "last_error": None, "delivered_at": None}
+            for channel in channels
+        }
+        record = {
+            "alert_id": uuid.uuid4().hex,
+            "status": "pending" if channels else "skipped",
+            "alert": alert,
+            "channels": channels,
+            "created_at": now,
+            "updated_at": now,
+            "next_attempt_at": now if channels else None
+        }
+        await self._call(self._save, record, True)
+        self.stats["queued"] += 1
+        self._wake.set()
+        return record
+
+    async def get(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Delivery record for one alert"""
+        return await self._call(self._get, alert_id)
+
+    def _get(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        self._open()
+        row = self._db.execute("SELECT * FROM alerts WHERE id = ?", (alert_id,)).fetchone()
+        return self._record(row) if row else None
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Alerts per delivery status plus counters since startup"""
+        rows = await self._call(self._count_by_status)
+        return {
+            "by_status": {status: count for status, count in rows},
+            "in_flight": len(self._inflight),
+            **self.stats
+        }
+
+    def _count_by_status(self) -> List[tuple]:
+        self._open()
+        return self._db.execute("SELECT status, COUNT(*) FROM alerts GROUP BY status").fetchall()
+
+    @staticmethod
+    def _record(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "alert_id": row["id"],
+            "status": row["status"],
+            "alert": json.loads(row["alert"]),
+            "channels": json.loads(row["channels"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "next_attempt_at": row["next_attempt_at"],
+            "lease_until": row["lease_until"]
+        }
+
+    def _save(self, record: Dict[str, Any], insert: bool = False):
+        values = (
+            json.dumps(record["alert"]),
+            record["status"],
+            json.dumps(record["channels"]),
+            record["updated_at"],
+            record["next_attempt_at"],
+            record["alert_id"]
+        )
+        if insert:
+            self._db.execute(
+                "INSERT INTO alerts (alert, status, channels, updated_at, next_attempt_at, id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                values + (record["created_at"],)
+            )
+        else:
+            self._db.execute(
+                "UPDATE alerts SET alert = ?, status = ?, channels = ?, updated_at = ?, next_attempt_at = ?, "
+                "lease_until = NULL WHERE id = ?",
+                values
+            )
+        self._db.commit()
+
+    def _claim(self, limit: int) -> List[str]:
+        """Lease up to `limit` due alerts; alerts another worker claimed first are skipped"""
+        now = time.time()
+        rows = self._db.execute(
+            "SELECT id FROM alerts WHERE status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at LIMIT ?",
+            (now, limit)
+        ).fetchall()
+        claimed = []
+        for row in rows:
+            cursor = self._db.execute(
+                "UPDATE alerts SET status = 'sending', lease_until = ? WHERE id = ? AND status = 'pending'",
+                (now + self.lease, row["id"])
+            )
+            if cursor.rowcount == 1:
+                claimed.append(row["id"])
+        self._db.commit()
+        return claimed
+
+    def _reclaim(self):
+        """Return alerts whose lease expired (their worker died) to pending"""
+        now = time.time()
+        expired = [
+            row["id"] for row in self._db.execute(
+                "SELECT id FROM alerts WHERE status = 'sending' AND lease_until < ?", (now,)
+            ) if row["id"] not in self._inflight
+        ]
+        if not expired:
+            return
+        reclaimed = 0
+        for alert_id in expired:
+            cursor = self._db.execute(
+                "UPDATE alerts SET status = 'pending', lease_until = NULL "
+                "WHERE id = ? AND status = 'sending' AND lease_until < ?",
+                (alert_id, now)
+            )
+            reclaimed += cursor.rowcount
+        self._db.commit()
+        if reclaimed:
+            self.stats["reclaimed"] += reclaimed
+            print(f"Alert outbox reclaimed {reclaimed} alert(s) with expired leases")
+
+    def _next_wakeup(self, inflight: Set[str]) -> Optional[float]:
+        """Seconds until the next retry or lease expiry, or None if nothing is waiting"""
+        row = self._db.execute(
+            "SELECT MIN(next_attempt_at) FROM alerts WHERE status = 'pending'"
+        ).fetchone()
+        times = [row[0]] if row[0] is not None else []
+        # Leases held by other workers; our own end when the delivery task does
+        times += [
+            lease_until for alert_id, lease_until in self._db.execute(
+                "SELECT id, lease_until FROM alerts WHERE status = 'sending'"
+            ) if alert_id not in inflight and lease_until is not None
+        ]
+        if not times:
+            return None
+        return max(min(times) - time.time(), 0.05)
+
+    async def _run(self):
+        failures = 0
+        while True:
+            try:
+                self._wake.clear()
+                await self._call(self._prune)
+                await self._call(self._reclaim)
+
+                free = self.concurrency - len(self._inflight)
+                if free > 0:
+                    for alert_id in await self._call(self._claim, free):
+                        self._inflight.add(alert_id)
+                        task = asyncio.create_task(self._deliver(alert_id))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+
+                # Sleep until a new alert, a finished delivery or the next retry
+                timeout = None
+                if len(self._inflight) < self.concurrency:
+                    timeout = await self._call(self._next_wakeup, set(self._inflight))
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. "database is locked" while other workers hold the file: back off and keep going
+                failures += 1
+                timeout = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+                print(f"Alert outbox worker error, retrying in {timeout:.1f}s: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, alert_id: str):
+        try:
+            record = await self.get(alert_id)
+            if record is None or record["status"] != "sending":
+                return
+
+            open_channels = [
+                channel for channel, state in record["channels"].items()
+                if state["status"] in OPEN_STATES
+            ]
+            outcomes = await asyncio.gather(
+                *[notifier.deliver(channel, record["alert"]) for channel in open_channels],
+                return_exceptions=True
+            )
+
+            now = time.time()
+            for channel, outcome in zip(open_channels, outcomes):
+                state = record["channels"][channel]
+                state["attempts"] += 1
+                if isinstance(outcome, BaseException):
+                    state["last_error"] = str(outcome) or type(outcome).__name__
+                    if state["attempts"] >= self.max_attempts:
+                        state["status"] = "failed"
+                        print(f"Alert {alert_id} to {channel} failed after {state['attempts']} attempts: {outcome}")
+                    else:
+                        state["status"] = "retrying"
+                        self.stats["retried"] += 1
+                else:
+                    state["status"] = "delivered"
+                    state["delivered_at"] = now
+
+            await self._call(self._finish, record, now)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Alert {alert_id} delivery error: {e}")
+        finally:
+            self._inflight.discard(alert_id)
+            if self._wake is not None:
+                self._wake.set()
+
+    def _finish(self, record: Dict[str, Any], now: float):
+        """Set the overall status and schedule the next attempt for open channels"""
+        states = [state["status"] for state in record["channels"].values()]
+        retrying = [
+            state["attempts"] for state in record["channels"].values()
+            if state["status"] in OPEN_STATES
+        ]
+        if retrying:
+            record["status"] = "pending"
+            attempts = max(retrying)
+            record["next_attempt_at"] = now + min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        else:
+            record["status"] = "failed" if "failed" in states else "delivered"
+            record["next_attempt_at"] = None
+        record["updated_at"] = now
+        self._save(record)
+        if record["status"] != "pending":
+            self.stats[record["status"]] += 1
+
+    def _prune(self):
+        """Drop finished alerts older than the retention period, at most once a minute"""
+        now = time.time()
+        if now - self._last_prune < 60:
+            return
+        self._last_prune = now
+        self._db.execute(
+            "DELETE FROM alerts WHERE status NOT IN (?, ?) AND updated_at < ?",
+            (*ACTIVE_STATES, now - self.retention)
+        )
+        self._db.commit()
+
+# Singleton instance
+alert_outbox = AlertOutbox()
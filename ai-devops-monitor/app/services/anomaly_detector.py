@@ -1,111 +1,246 @@
 import numpy as np
-from typing import Dict, Any, Tuple
-from pyod.models.iforest import IForest
-from sentence_transformers import SentenceTransformer
+from typing import Dict, Any, Tuple, List, Optional
 import pickle
 import os
+import threading
+from app.services.embedding_cache import embedding_cache
+from app.services.encoders import load_encoder
+from app.services.projection import EmbeddingProjection
+from app.utils.config import settings
+
+LEVEL_ENCODING = {
+    "DEBUG": 0, "INFO": 1, "WARNING": 2, "ERROR": 3, "CRITICAL": 4
+}
+ANOMALY_KEYWORDS = ["exception", "failed", "error", "timeout", "crash"]
 
 class AnomalyDetector:
     def __init__(self):
         self.model = None
         self.encoder = None
+        self.projection: Optional[EmbeddingProjection] = None
         self.threshold = 0.5
-        self._load_model()
-        self._load_encoder()
+        self.model_version = "heuristic"
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        
+        # Known before loading so stored scores can be matched without the model
+        model_path = "app/models/anomaly_model.pkl"
+        if os.path.exists(model_path) and os.path.getsize(model_path) > 100:
+            self.model_version = f"iforest-{int(os.path.getmtime(model_path))}"
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+    
+    def ensure_loaded(self):
+        """Load the model and encoder on first use"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._load_model()
+            self._load_encoder()
+            self._loaded = True
     
     def _load_model(self):
         """Load pre-trained anomaly detection model or create new one"""
+        from pyod.models.iforest import IForest
+        
         model_path = "app/models/anomaly_model.pkl"
         
         if os.path.exists(model_path) and os.path.getsize(model_path) > 100:
             try:
                 with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
+                    saved = pickle.load(f)
+                # Older files hold the bare IForest without a projection stage
+                if isinstance(saved, dict):
+                    self.model, self.projection = saved["model"], saved.get("projection")
+                else:
+                    self.model, self.projection = saved, None
+                self.model_version = f"iforest-{int(os.path.getmtime(model_path))}"
                 print("Loaded pre-trained anomaly detection model")
             except Exception as e:
                 print(f"Failed to load model: {e}. Using new model.")
                 self.model = IForest(contamination=0.1, random_state=42)
+                self.projection = None
+                self.model_version = "heuristic"
         else:
             # Initialize with Isolation Forest
             self.model = IForest(contamination=0.1, random_state=42)
             print("Initialized new anomaly detection model")
     
     def _load_encoder(self):
-        """Load sentence transformer for text embedding"""
+        """Load the configured text embedding backend"""
         try:
-            self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+            self.encoder = load_encoder(
+                settings.ENCODER_BACKEND,
+                onnx_path=settings.ENCODER_ONNX_PATH,
+                threads=settings.ENCODER_THREADS
+            )
+            embedding_cache.namespace = self.encoder.cache_namespace
+            print(f"Loaded {self.encoder.name} encoder")
         except Exception as e:
             print(f"Failed to load encoder: {e}")
             self.encoder = None
     
     def _extract_features(self, log: Dict[str, Any]) -> np.ndarray:
         """Extract features from log entry"""
+        return self._extract_features_batch([log], self.projection)
+    
+    def _extract_features_batch(
+        self,
+        logs: List[Dict[str, Any]],
+        projection: Optional[EmbeddingProjection] = None
+    ) -> np.ndarray:
+        """
+        Extract a feature matrix for a batch of logs, one row per log
+        Embeddings are reduced by projection when one is given
+        """
+        messages = [log.get("message") or "" for log in logs]
+        lengths = np.fromiter((len(m) for m in messages), dtype=np.float64, count=len(messages))
+        
         if not self.encoder:
             # Fallback: simple feature extraction
-            features = [
-                len(log.get("message", "")),
-                1 if log.get("level") == "ERROR" else 0,
-                1 if log.get("level") == "CRITICAL" else 0
-            ]
-            return np.array(features).reshape(1, -1)
+            levels = np.array([log.get("level") for log in logs], dtype=object)
+            return np.column_stack([
+                lengths,
+                levels == "ERROR",
+                levels == "CRITICAL"
+            ]).astype(np.float64)
         
-        # Use sentence transformer for message embedding
-        message = log.get("message", "")
-        embedding = self.encoder.encode(message)
+        # Embed all uncached messages in one batched call
+        embeddings = embedding_cache.encode(messages, self._encode)
+        if projection is not None:
+            embeddings = projection.transform(embeddings)
         
-        # Add level encoding
-        level_encoding = {
-            "DEBUG": 0, "INFO": 1, "WARNING": 2, "ERROR": 3, "CRITICAL": 4
-        }
-        level_val = level_encoding.get(log.get("level", "INFO"), 1)
+        # Combine embeddings, level encoding and length into one float32 matrix
+        features = np.empty((len(logs), embeddings.shape[1] + 2), dtype=np.float32)
+        features[:, :-2] = embeddings
+        features[:, -2] = np.fromiter(
+            (LEVEL_ENCODING.get(log.get("level", "INFO"), 1) for log in logs),
+            dtype=np.float32,
+            count=len(logs)
+        )
+        features[:, -1] = lengths
+        return features
+    
+    def _encode(self, messages: List[str]) -> np.ndarray:
+        """Run the sentence encoder over a batch of messages"""
+        return self.encoder.encode(messages)
+    
+    def _heuristic_scores(self, logs: List[Dict[str, Any]]) -> np.ndarray:
+        """Score logs by level and error keywords when no model is trained"""
+        levels = np.array([log.get("level") for log in logs], dtype=object)
+        messages = np.array([(log.get("message") or "").lower() for log in logs], dtype=str)
         
-        # Combine features
-        features = np.append(embedding, [level_val, len(message)])
-        return features.reshape(1, -1)
+        flagged = np.isin(levels, ["ERROR", "CRITICAL"])
+        for keyword in ANOMALY_KEYWORDS:
+            flagged |= np.char.find(messages, keyword) >= 0
+        
+        return np.where(flagged, 0.8, 0.2)
     
     def detect_anomaly(self, log: Dict[str, Any]) -> Tuple[bool, float]:
         """
         Detect if a log entry is anomalous
         Returns: (is_anomaly, anomaly_score)
         """
-        try:
-            features = self._extract_features(log)
-            
-            # For new model without training data, use heuristics
-            if not hasattr(self.model, 'decision_scores_'):
-                # Simple heuristic-based detection
-                is_error = log.get("level") in ["ERROR", "CRITICAL"]
-                has_keywords = any(keyword in log.get("message", "").lower() 
-                                 for keyword in ["exception", "failed", "error", "timeout", "crash"])
-                
-                if is_error or has_keywords:
-                    return True, 0.8
-                return False, 0.2
-            
-            # Use trained model
-            score = self.model.decision_function(features)[0]
-            is_anomaly = score > self.threshold
-            
-            # Normalize score to 0-1 range
-            normalized_score = min(max((score + 0.5) / 1.5, 0), 1)
-            
-            return bool(is_anomaly), float(normalized_score)
+        return self.detect_anomalies([log])[0]
+    
+    def detect_anomalies(self, logs: List[Dict[str, Any]]) -> List[Tuple[bool, float]]:
+        """
+        Detect anomalies for a batch of logs with one encode and one model call
+        Returns: [(is_anomaly, anomaly_score), ...] in input order
+        """
+        if not logs:
+            return []
         
+        try:
+            return self.score_logs(logs)
         except Exception as e:
             print(f"Anomaly detection error: {e}")
-            return False, 0.0
+            return [(False, 0.0)] * len(logs)
+    
+    def score_logs(self, logs: List[Dict[str, Any]]) -> List[Tuple[bool, float]]:
+        """Score a batch of logs, raising on failure"""
+        self.ensure_loaded()
+        
+        # For new model without training data, use heuristics
+        if not hasattr(self.model, 'decision_scores_'):
+            scores = self._heuristic_scores(logs)
+            return [(bool(score > 0.5), float(score)) for score in scores]
+        
+        # Use trained model; read both together in case training swaps them
+        model, projection = self.model, self.projection
+        features = self._extract_features_batch(logs, projection)
+        scores = model.decision_function(features)
+        is_anomaly = scores > self.threshold
+        
+        # Normalize score to 0-1 range
+        normalized_scores = np.clip((scores + 0.5) / 1.5, 0, 1)
+        
+        return [
+            (bool(flag), float(score))
+            for flag, score in zip(is_anomaly, normalized_scores)
+        ]
+    
+    def annotate(self, logs: List[Dict[str, Any]]) -> int:
+        """
+        Write anomaly_score, is_anomaly and anomaly_model into each log in place
+        Returns the number of logs scored; on failure logs are left unscored
+        """
+        if not logs:
+            return 0
+        
+        try:
+            results = self.score_logs(logs)
+        except Exception as e:
+            print(f"Anomaly scoring failed for {len(logs)} logs: {e}")
+            return 0
+        
+        return self.apply_scores(logs, results)
+    
+    def apply_scores(self, logs: List[Dict[str, Any]], results: List[Tuple[bool, float]]) -> int:
+        """Store (is_anomaly, anomaly_score) results on their logs"""
+        for log, (is_anomaly, score) in zip(logs, results):
+            log["anomaly_score"] = score
+            log["is_anomaly"] = is_anomaly
+            log["anomaly_model"] = self.model_version
+        return len(logs)
+    
+    def stored_score(self, log: Dict[str, Any]) -> Optional[Tuple[bool, float]]:
+        """Score stored on a log by the current model version, if any"""
+        if log.get("anomaly_model") == self.model_version and "anomaly_score" in log:
+            return bool(log.get("is_anomaly")), float(log["anomaly_score"])
+        return None
     
     def train(self, logs: list):
         """Train model on historical logs"""
         try:
-            features = np.vstack([self._extract_features(log) for log in logs])
-            self.model.fit(features)
+            from pyod.models.iforest import IForest
+            self.ensure_loaded()
+            features = self._extract_features_batch(logs)
+            
+            # Reduce the embedding columns, keeping level and length as-is
+            projection = None
+            if self.encoder is not None and settings.ANOMALY_PROJECTION != "none":
+                projection = EmbeddingProjection(
+                    settings.ANOMALY_PROJECTION,
+                    settings.ANOMALY_PROJECTION_DIM
+                ).fit(features[:, :-2])
+                features = np.column_stack([projection.transform(features[:, :-2]), features[:, -2:]])
             
-            # Save model
+            model = IForest(contamination=0.1, random_state=42)
+            model.fit(features)
+            
+            # Save model and projection together
             model_path = "app/models/anomaly_model.pkl"
             os.makedirs(os.path.dirname(model_path), exist_ok=True)
             with open(model_path, 'wb') as f:
-                pickle.dump(self.model, f)
+                pickle.dump({"model": model, "projection": projection}, f)
+            
+            self.model, self.projection = model, projection
+            self.model_version = f"iforest-{int(os.path.getmtime(model_path))}"
             
             return True
         except Exception as e:
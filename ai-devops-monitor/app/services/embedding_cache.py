@@ -0,0 +1,248 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Callable
+from collections import OrderedDict
+import hashlib
+import threading
+import os
+from app.utils.preprocess import clean_message
+from app.utils.config import settings
+
+KEY_SIZE = 16
+CHECK_SIZE = 8
+DISK_MAGIC = b"EMBCACHE"
+# Bumped when the slot layout changes; files in another format are recreated
+DISK_VERSION = 2
+DISK_HEADER_SIZE = 64
+DISK_MAX_PROBES = 8
+
+class DiskEmbeddingStore:
+    """
+    Fixed-capacity, open-addressed hash table of embeddings in a memory-mapped file
+
+    Several uvicorn workers can map the same file and share entries without
+    locking. Each slot stores a checksum of its key and vector, and a slot
+    whose checksum does not match (a read racing a write, or two workers
+    writing the same slot) is treated as a miss, so a torn or mismatched
+    entry is never returned.
+    """
+
+    def __init__(self, path: str, capacity: int, dim: int):
+        self.path = path
+        self.capacity = capacity
+        self.dim = dim
+        self.slot_dtype = np.dtype([
+            ("key", f"V{KEY_SIZE}"), ("check", f"V{CHECK_SIZE}"), ("vec", "<f4", (dim,))
+        ])
+        self._create_if_missing()
+        self.slots = np.memmap(
+            path, dtype=self.slot_dtype, mode="r+",
+            offset=DISK_HEADER_SIZE, shape=(capacity,)
+        )
+        # Counted once here and kept up to date by put(); entries other workers add are not seen
+        self.entries = self._count()
+
+    @staticmethod
+    def read_header(path: str) -> Optional[Dict[str, int]]:
+        """Return the dim/capacity/version stored in an existing cache file"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            header = f.read(DISK_HEADER_SIZE)
+        if len(header) < DISK_HEADER_SIZE or not header.startswith(DISK_MAGIC):
+            return None
+        dim, capacity, version = np.frombuffer(header, dtype="<u4", count=3, offset=len(DISK_MAGIC))
+        return {"dim": int(dim), "capacity": int(capacity), "version": int(version)}
+
+    def _create_if_missing(self):
+        """Create the file atomically so concurrent workers agree on one inode"""
+        header = self.read_header(self.path)
+        if header == {"dim": self.dim, "capacity": self.capacity, "version": DISK_VERSION}:
+            return
+        if header is not None:
+            # Encoder, capacity or format changed: start from an empty store
+            os.remove(self.path)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(DISK_MAGIC)
+            f.write(np.array([self.dim, self.capacity, DISK_VERSION], dtype="<u4").tobytes())
+            f.truncate(DISK_HEADER_SIZE + self.slot_dtype.itemsize * self.capacity)
+        try:
+            os.link(tmp_path, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp_path)
+
+    def _probe(self, key: bytes):
+        start = int.from_bytes(key[:8], "little") % self.capacity
+        for i in range(min(DISK_MAX_PROBES, self.capacity)):
+            yield (start + i) % self.capacity
+
+    @staticmethod
+    def _checksum(key: bytes, vector: bytes) -> bytes:
+        return hashlib.blake2b(vector, key=key, digest_size=CHECK_SIZE).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        for slot in self._probe(key):
+            stored = self.slots[slot]["key"].tobytes()
+            if stored == bytes(KEY_SIZE):
+                return None
+            if stored != key:
+                continue
+            # Copy the slot once, then check it was not torn by a concurrent write
+            record = self.slots[slot].copy()
+            vector = record["vec"]
+            if record["key"].tobytes() == key and record["check"].tobytes() == self._checksum(key, vector.tobytes()):
+                return np.array(vector)
+            return None
+        return None
+
+    def put(self, key: bytes, vector: np.ndarray):
+        target = None
+        for slot in self._probe(key):
+            stored = self.slots[slot]["key"].tobytes()
+            if stored == key or stored == bytes(KEY_SIZE):
+                target = slot
+                break
+        if target is None:
+            # Probe window full: overwrite the home slot
+            target = next(self._probe(key))
+
+        vector = np.ascontiguousarray(vector, dtype="<f4")
+        if self.slots[target]["key"].tobytes() == bytes(KEY_SIZE):
+            self.entries = min(self.entries + 1, self.capacity)
+        self.slots[target]["vec"] = vector
+        self.slots[target]["key"] = np.void(key)
+        self.slots[target]["check"] = np.void(self._checksum(key, vector.tobytes()))
+
+    def _count(self) -> int:
+        keys = np.frombuffer(self.slots["key"].tobytes(), dtype=np.uint8).reshape(self.capacity, KEY_SIZE)
+        return int(np.count_nonzero(keys.any(axis=1)))
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of message embeddings
+    An in-memory LRU sits in front of an optional memory-mapped disk store
+    """
+
+    def __init__(self, max_entries: int, disk_path: str = "", disk_entries: int = 0, namespace: str = ""):
+        self.max_entries = max_entries
+        # Mixed into every key so embeddings from different encoders never collide
+        self.namespace = namespace
+        self.disk_path = disk_path
+        self.disk_entries = disk_entries
+        self._memory: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._disk: Optional[DiskEmbeddingStore] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_path and disk_entries > 0:
+            header = DiskEmbeddingStore.read_header(disk_path)
+            if header and header["capacity"] == disk_entries:
+                self._open_disk(header["dim"])
+
+    def key(self, message: str) -> bytes:
+        """Hash of the encoder namespace and the cleaned message"""
+        data = clean_message(message).encode("utf-8")
+        if self.namespace:
+            data = self.namespace.encode("utf-8") + b"\0" + data
+        return hashlib.blake2b(data, digest_size=KEY_SIZE).digest()
+
+    def _open_disk(self, dim: int):
+        try:
+            self._disk = DiskEmbeddingStore(self.disk_path, self.disk_entries, dim)
+        except Exception as e:
+            print(f"Failed to open embedding cache at {self.disk_path}: {e}")
+            self._disk = None
+            self.disk_path = ""
+
+    def _remember(self, key: bytes, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: bytes) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return vector
+
+        if self._disk is not None:
+            vector = self._disk.get(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.hits += 1
+                self.disk_hits += 1
+                return vector
+
+        self.misses += 1
+        return None
+
+    def encode(
+        self,
+        messages: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Return embeddings for messages, calling encode_fn once for the
+        distinct messages that are not cached yet
+        """
+        keys = [self.key(message) for message in messages]
+        vectors: Dict[bytes, np.ndarray] = {}
+        missing: Dict[bytes, str] = {}
+
+        with self._lock:
+            for key, message in zip(keys, messages):
+                if key in vectors or key in missing:
+                    continue
+                vector = self._lookup(key)
+                if vector is not None:
+                    vectors[key] = vector
+                else:
+                    missing[key] = message
+
+        if missing:
+            encoded = np.asarray(encode_fn(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                if self._disk is None and self.disk_path and self.disk_entries > 0:
+                    self._open_disk(encoded.shape[1])
+                for key, vector in zip(missing, encoded):
+                    vectors[key] = vector
+                    self._remember(key, vector)
+                    if self._disk is not None:
+                        self._disk.put(key, vector)
+
+        return np.vstack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current sizes"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_capacity": self.max_entries,
+            "disk_entries": self._disk.entries if self._disk is not None else 0,
+            "disk_capacity": self.disk_entries if self._disk is not None else 0
+        }
+
+    def clear(self):
+        """Drop the in-memory entries and reset counters"""
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+# Singleton instance
+embedding_cache = EmbeddingCache(
+    max_entries=settings.EMBEDDING_CACHE_SIZE,
+    disk_path=settings.EMBEDDING_CACHE_PATH,
+    disk_entries=settings.EMBEDDING_CACHE_DISK_ENTRIES
+)
@@ -0,0 +1,104 @@
+import hashlib
+import os
+import numpy as np
+from typing import List
+
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+
+def _fingerprint(*paths: str) -> str:
+    """Short content hash of files, so a re-exported model does not reuse old embeddings"""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class SentenceTransformerEncoder:
+    """Full-precision PyTorch MiniLM through sentence-transformers"""
+    name = "sentence-transformers"
+    # Empty so caches written before backends existed stay valid
+    cache_namespace = ""
+
+    def __init__(self, model_name: str = SENTENCE_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, messages: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(messages, convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(embeddings, dtype=np.float32)
+
+class OnnxEncoder:
+    """
+    MiniLM exported to ONNX (int8-quantized by export_encoder.py) on ONNX Runtime
+
+    Reproduces the sentence-transformers pipeline: WordPiece tokenization,
+    mean pooling over the attention mask and L2 normalization.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str, threads: int = 0, batch_size: int = 32, max_length: int = 256):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        tokenizer_path = os.path.join(os.path.dirname(model_path), "tokenizer.json")
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.cache_namespace = f"onnx:{os.path.basename(model_path)}:{_fingerprint(model_path, tokenizer_path)}"
+
+    def encode(self, messages: List[str]) -> np.ndarray:
+        if not messages:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Sort by length so each batch pads to a similar size
+        order = sorted(range(len(messages)), key=lambda i: len(messages[i]))
+        embeddings = [None] * len(messages)
+
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._encode_batch([messages[i] for i in batch])):
+                embeddings[i] = vector
+
+        return np.vstack(embeddings)
+
+    def _encode_batch(self, messages: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(messages)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        # Mean pooling over real tokens, then unit length
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+
+def load_encoder(backend: str, onnx_path: str = "", threads: int = 0):
+    """
+    Build the configured encoder backend
+    Falls back to sentence-transformers if the ONNX model cannot be loaded
+    """
+    if backend == "onnx":
+        try:
+            return OnnxEncoder(onnx_path, threads=threads)
+        except Exception as e:
+            print(f"Failed to load ONNX encoder from {onnx_path}: {e}. Falling back to sentence-transformers.")
+    elif backend != "sentence-transformers":
+        print(f"Unknown encoder backend '{backend}'. Using sentence-transformers.")
+
+    return SentenceTransformerEncoder()
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+import aiohttp
+from app.services.opensearch_client import opensearch_client
+from app.services.anomaly_detector import anomaly_detector
+from app.services.embedding_cache import embedding_cache
+from app.services.inference import inference_service
+from app.services.predictor import predictor
+from app.services.llm_agent import llm_agent
+from app.utils.readiness import readiness
+from app.utils.config import settings
+
+class HealthChecker:
+    """
+    Probes dependencies and reports what is actually up
+
+    Each probe result is cached for HEALTH_CACHE_TTL seconds and concurrent
+    callers share one in-flight probe, so health endpoints stay cheap even
+    when polled by many orchestrator replicas.
+    """
+
+    def __init__(self):
+        self.ttl = settings.HEALTH_CACHE_TTL
+        self.timeout = settings.HEALTH_PROBE_TIMEOUT
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _cached(self, name: str, probe: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        entry = self._cache.get(name)
+        if entry and time.monotonic() - entry["at"] < self.ttl:
+            return entry["result"]
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            entry = self._cache.get(name)
+            if entry and time.monotonic() - entry["at"] < self.ttl:
+                return entry["result"]
+
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(probe(), self.timeout)
+            except asyncio.TimeoutError:
+                result = {"status": "down", "error": f"timed out after {self.timeout}s"}
+            except Exception as e:
+                result = {"status": "down", "error": str(e)}
+            result["latency_ms"] = round((time.monotonic() - start) * 1000, 1)
+            result["checked_at"] = time.time()
+
+            self._cache[name] = {"at": time.monotonic(), "result": result}
+            return result
+
+    async def _probe_opensearch(self) -> Dict[str, Any]:
+        health = await opensearch_client.cluster_health()
+        cluster_status = health.get("status")
+        return {
+            "status": "down" if cluster_status == "red" else "up",
+            "cluster_status": cluster_status,
+            "active_shards_percent": health.get("active_shards_percent_as_number")
+        }
+
+    @staticmethod
+    def _model_tag(name: str) -> str:
+        """Full model name as Ollama lists it; an untagged name means :latest"""
+        name = name.strip()
+        # A colon before the last slash belongs to a registry host:port, not a tag
+        return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+    async def _probe_ollama(self) -> Dict[str, Any]:
+        url = f"{settings.OLLAMA_BASE_URL.rstrip('/')}/api/tags"
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return {"status": "down", "error": f"HTTP {response.status}"}
+                tags = await response.json()
+
+        wanted = self._model_tag(settings.OLLAMA_MODEL)
+        models = [m.get("name", "") for m in tags.get("models", [])]
+        model_pulled = any(self._model_tag(name) == wanted for name in models)
+        return {
+            "status": "up" if model_pulled else "degraded",
+            "model": settings.OLLAMA_MODEL,
+            "model_pulled": model_pulled
+        }
+
+    def _models(self) -> Dict[str, Any]:
+        """Which models are loaded, which mode each one runs in and their batching/cache counters"""
+        if not anomaly_detector.is_loaded:
+            anomaly_mode = "not_loaded"
+        elif not hasattr(anomaly_detector.model, "decision_scores_"):
+            anomaly_mode = "heuristic"
+        elif anomaly_detector.encoder is None:
+            anomaly_mode = "no_encoder"
+        else:
+            anomaly_mode = "model"
+
+        if not predictor.is_loaded:
+            predictor_mode = "not_loaded"
+        else:
+            predictor_mode = "model" if predictor.model is not None else "heuristic"
+
+        if not llm_agent.is_loaded:
+            llm_mode = "not_loaded"
+        else:
+            llm_mode = "llm" if llm_agent.session is not None else "rule_based"
+
+        batching = inference_service.get_stats()
+
+        return {
+            "anomaly_detector": {
+                "loaded": anomaly_detector.is_loaded,
+                "mode": anomaly_mode,
+                "model_version": anomaly_detector.model_version,
+                "encoder": anomaly_detector.encoder.name if anomaly_detector.encoder is not None else None,
+                "batching": batching["anomaly"],
+                "embedding_cache": embedding_cache.stats()
+            },
+            "predictor": {"loaded": predictor.is_loaded, "mode": predictor_mode, "batching": batching["prediction"]},
+            "llm_agent": {"loaded": llm_agent.is_loaded, "mode": llm_mode}
+        }
+
+    async def check(self) -> Dict[str, Any]:
+        """Full readiness report; ready means OpenSearch is reachable"""
+        opensearch, ollama = await asyncio.gather(
+            self._cached("opensearch", self._probe_opensearch),
+            self._cached("ollama", self._probe_ollama)
+        )
+        models = self._models()
+
+        degraded = []
+        if ollama["status"] != "up" or models["llm_agent"]["mode"] == "rule_based":
+            degraded.append("rca_rule_based_fallback")
+        if models["anomaly_detector"]["mode"] in ("heuristic", "no_encoder"):
+            degraded.append(f"anomaly_detection_{models['anomaly_detector']['mode']}")
+        if models["predictor"]["mode"] == "heuristic":
+            degraded.append("failure_prediction_heuristic")
+        if any(m["mode"] == "not_loaded" for m in models.values()):
+            degraded.append("models_warming")
+
+        if opensearch["status"] != "up":
+            status = "not_ready"
+        elif degraded:
+            status = "degraded"
+        else:
+            status = "ready"
+
+        return {
+            "status": status,
+            "ready": opensearch["status"] == "up",
+            "degraded": degraded,
+            "dependencies": {
+                "opensearch": opensearch,
+                "ollama": ollama
+            },
+            "models": models,
+            "startup": readiness.snapshot()
+        }
+
+# Singleton instance
+health_checker = HealthChecker()
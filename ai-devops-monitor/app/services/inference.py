@@ -0,0 +1,174 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.services.anomaly_detector import anomaly_detector
+from app.services.predictor import predictor
+from app.utils.config import settings
+
+class MicroBatcher:
+    """
+    Coalesces concurrent calls to a batch function
+
+    Each caller submits a list of items. Requests that arrive within
+    max_wait_ms of each other (up to max_batch_size items) are concatenated,
+    run once on the executor, and every caller receives its own slice.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        executor: ThreadPoolExecutor,
+        max_batch_size: int,
+        max_wait_ms: float
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "items": 0, "batches": 0}
+
+    async def submit(self, items: List[Any]) -> List[Any]:
+        """Queue items and wait for their results"""
+        if not items:
+            return []
+
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((items, future))
+        self.stats["requests"] += 1
+        return await future
+
+    async def _run(self):
+        """Collect a batch, run it, hand each caller its slice"""
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self._queue.get()]
+            size = len(requests[0][0])
+            deadline = loop.time() + self.max_wait
+
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                requests.append(request)
+                size += len(request[0])
+
+            batch = [item for items, _ in requests for item in items]
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, batch)
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            offset = 0
+            for items, future in requests:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(items)])
+                offset += len(items)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+class InferenceService:
+    """
+    Runs model inference off the event loop on one dedicated worker thread,
+    batching concurrent anomaly-scoring and failure-prediction requests
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.anomaly = MicroBatcher(
+            "anomaly",
+            anomaly_detector.score_logs,
+            self.executor,
+            settings.INFERENCE_MAX_BATCH_SIZE,
+            settings.INFERENCE_MAX_WAIT_MS
+        )
+        self.prediction = MicroBatcher(
+            "prediction",
+            predictor.predict_failures,
+            self.executor,
+            settings.INFERENCE_MAX_BATCH_SIZE,
+            settings.INFERENCE_MAX_WAIT_MS
+        )
+
+    async def detect_anomalies(self, logs: List[Dict[str, Any]]) -> List[Tuple[bool, float]]:
+        """Batched AnomalyDetector.detect_anomalies"""
+        try:
+            return await self.anomaly.submit(logs)
+        except Exception as e:
+            print(f"Anomaly detection error: {e}")
+            return [(False, 0.0)] * len(logs)
+
+    async def annotate(self, logs: List[Dict[str, Any]]) -> int:
+        """Batched AnomalyDetector.annotate"""
+        try:
+            results = await self.anomaly.submit(logs)
+        except Exception as e:
+            print(f"Anomaly scoring failed for {len(logs)} logs: {e}")
+            return 0
+        return anomaly_detector.apply_scores(logs, results)
+
+    async def annotate_if_ready(self, logs: List[Dict[str, Any]]) -> int:
+        """
+        Annotate only once the detector is warm, so ingest never waits on model loading
+        Logs skipped here are scored lazily by /analysis/anomalies
+        """
+        if not anomaly_detector.is_loaded:
+            return 0
+        return await self.annotate(logs)
+
+    async def get_scores(self, logs: List[Dict[str, Any]]) -> List[Tuple[bool, float]]:
+        """Reuse scores stored by the current model and compute the rest"""
+        results = [anomaly_detector.stored_score(log) for log in logs]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            computed = await self.detect_anomalies([logs[i] for i in missing])
+            for i, result in zip(missing, computed):
+                results[i] = result
+        return results
+
+    async def predict_failure(self, logs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Batched Predictor.predict_failure"""
+        return (await self.predict_failures([logs]))[0]
+
+    async def predict_failures(self, log_groups: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Batched Predictor.predict_failures"""
+        return await self.prediction.submit(log_groups)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "anomaly": dict(self.anomaly.stats),
+            "prediction": dict(self.prediction.stats)
+        }
+
+    async def close(self):
+        """Stop batchers and the worker thread"""
+        await self.anomaly.close()
+        await self.prediction.close()
+        self.executor.shutdown(wait=False)
+
+# Singleton instance
+inference_service = InferenceService()
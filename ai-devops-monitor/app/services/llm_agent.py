@@ -1,25 +1,19 @@
-from typing import List, Dict, Any
-from langchain_community.llms import Ollama
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from typing import List, Dict, Any, Tuple, AsyncIterator
+from collections import OrderedDict
+import asyncio
+import aiohttp
+import hashlib
 import json
+import requests
+import threading
+import time
+from app.utils.config import settings
+from app.utils.log_compaction import compact_logs
 
-class LLMAgent:
-    def __init__(self):
-        self.llm = None
-        self.chain = None
-        self._initialize()
-    
-    def _initialize(self):
-        """Initialize Ollama with Mistral model"""
-        try:
-            self.llm = Ollama(
-                model="mistral",
-                base_url="http://ollama:11434"
-            )
-            
-            # Create prompt template for RCA
-            template = """You are an expert DevOps engineer analyzing system logs for root cause analysis.
+# Log fields that affect the prompt, and so the cache key
+PROMPT_FIELDS = ("timestamp", "level", "service", "message", "template_id", "template")
+
+RCA_PROMPT_TEMPLATE = """You are an expert DevOps engineer analyzing system logs for root cause analysis.
 
 Given the following logs:
 {logs}
@@ -34,53 +28,217 @@ Please provide:
 
 Keep your analysis concise and actionable."""
 
-            prompt = PromptTemplate(
-                input_variables=["logs", "context"],
-                template=template
-            )
-            
-            self.chain = LLMChain(llm=self.llm, prompt=prompt)
+class LLMAgent:
+    def __init__(self):
+        self.session = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
         
+        # RCA results by cache key: (expires_at, analysis)
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.cache_ttl = settings.RCA_CACHE_TTL
+        self.cache_max_entries = settings.RCA_CACHE_MAX_ENTRIES
+        self.cache_stats = {"hits": 0, "misses": 0, "coalesced": 0}
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+    
+    def ensure_loaded(self):
+        """Open the Ollama session on first use"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._initialize()
+            self._loaded = True
+    
+    def _initialize(self):
+        """Open a keep-alive HTTP session to Ollama"""
+        try:
+            self.session = requests.Session()
         except Exception as e:
             print(f"Failed to initialize LLM: {e}")
-            self.llm = None
+            self.session = None
+    
+    @property
+    def generate_url(self) -> str:
+        return f"{settings.OLLAMA_BASE_URL.rstrip('/')}/api/generate"
+    
+    def _generate_payload(self, logs: List[Dict[str, Any]], context: str, stream: bool) -> Dict[str, Any]:
+        """/api/generate request body; both the blocking and the streaming path send this"""
+        prompt = RCA_PROMPT_TEMPLATE.format(logs=self._format_logs(logs), context=context)
+        return {"model": settings.OLLAMA_MODEL, "prompt": prompt, "stream": stream}
     
     def analyze_logs(self, logs: List[Dict[str, Any]], context: str = "") -> str:
         """
         Perform root cause analysis on logs using LLM
         """
+        return self._analyze(logs, context)[0]
+    
+    def _analyze(self, logs: List[Dict[str, Any]], context: str = "") -> Tuple[str, bool]:
+        """Run the analysis; returns (analysis, generated_by_llm)"""
         try:
-            # Format logs for LLM
-            log_text = self._format_logs(logs)
+            self.ensure_loaded()
             
-            if self.chain:
+            if self.session:
                 # Use LLM for analysis
-                response = self.chain.run(logs=log_text, context=context)
-                return response
+                response = self.session.post(
+                    self.generate_url,
+                    json=self._generate_payload(logs, context, stream=False),
+                    timeout=(5, None)
+                )
+                response.raise_for_status()
+                body = response.json()
+                if body.get("error"):
+                    raise RuntimeError(body["error"])
+                return body.get("response", ""), True
             else:
                 # Fallback: rule-based analysis
-                return self._fallback_analysis(logs)
+                return self.fallback_analysis(logs), False
         
         except Exception as e:
             print(f"LLM analysis error: {e}")
-            return self._fallback_analysis(logs)
+            return self.fallback_analysis(logs), False
     
-    def _format_logs(self, logs: List[Dict[str, Any]]) -> str:
-        """Format logs for LLM input"""
-        formatted = []
-        for i, log in enumerate(logs[:10], 1):  # Limit to 10 logs
-            timestamp = log.get("timestamp", "N/A")
-            level = log.get("level", "INFO")
-            service = log.get("service", "unknown")
-            message = log.get("message", "")
-            
-            formatted.append(
-                f"{i}. [{timestamp}] {level} - {service}: {message}"
-            )
+    def cache_key(self, logs: List[Dict[str, Any]], context: str = "") -> str:
+        """Hash of the sorted log ids, their prompt content, the context and the model"""
+        entries = sorted(
+            [str(log.get("_id", ""))] + [str(log.get(field, "")) for field in PROMPT_FIELDS]
+            for log in logs
+        )
+        payload = json.dumps([entries, context, settings.OLLAMA_MODEL])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _cache_get(self, key: str):
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, analysis = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return analysis
+    
+    def _cache_put(self, key: str, analysis: str):
+        self._cache[key] = (time.monotonic() + self.cache_ttl, analysis)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+    
+    def cached_analysis(self, logs: List[Dict[str, Any]], context: str = "") -> Any:
+        """Cached analysis for these logs and context, or None"""
+        return self._cache_get(self.cache_key(logs, context))
+    
+    async def analyze_logs_cached(self, logs: List[Dict[str, Any]], context: str = "") -> Tuple[str, bool]:
+        """
+        Root cause analysis off the event loop, served from cache when possible
+        Identical concurrent requests share one generation. Returns (analysis, cached)
+        """
+        key = self.cache_key(logs, context)
+        analysis = self._cache_get(key)
+        if analysis is not None:
+            self.cache_stats["hits"] += 1
+            return analysis, True
+        
+        # Run the generation as its own task so a disconnecting caller does not cancel it for the others
+        task = self._inflight.get(key)
+        if task is None:
+            self.cache_stats["misses"] += 1
+            task = asyncio.create_task(self._generate(key, logs, context))
+            self._inflight[key] = task
+        else:
+            self.cache_stats["coalesced"] += 1
+        
+        return await asyncio.shield(task), False
+    
+    async def _generate(self, key: str, logs: List[Dict[str, Any]], context: str) -> str:
+        try:
+            analysis, from_llm = await asyncio.to_thread(self._analyze, logs, context)
+            # Rule-based fallbacks are cheap; caching them would hide the LLM once it recovers
+            if from_llm and self.cache_ttl > 0:
+                self._cache_put(key, analysis)
+            return analysis
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def stream_analysis(
+        self,
+        logs: List[Dict[str, Any]],
+        context: str = ""
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Root cause analysis streamed from Ollama as it is generated
+        Yields ("meta", {"cached": bool}) first, then ("token", text) chunks
+        """
+        key = self.cache_key(logs, context)
+        analysis = self._cache_get(key)
+        if analysis is not None:
+            self.cache_stats["hits"] += 1
+            yield "meta", {"cached": True}
+            yield "token", analysis
+            return
+        
+        self.cache_stats["misses"] += 1
+        yield "meta", {"cached": False}
+        
+        await asyncio.to_thread(self.ensure_loaded)
+        if self.session is None:
+            yield "token", self.fallback_analysis(logs)
+            return
+        
+        parts = []
+        try:
+            async for token in self._stream_ollama(self._generate_payload(logs, context, stream=True)):
+                parts.append(token)
+                yield "token", token
+        except Exception as e:
+            # Nothing sent yet: answer with the rule-based analysis instead
+            if parts:
+                raise
+            print(f"LLM streaming error: {e}")
+            yield "token", self.fallback_analysis(logs)
+            return
         
-        return "\n".join(formatted)
+        if self.cache_ttl > 0:
+            self._cache_put(key, "".join(parts))
+    
+    async def _stream_ollama(self, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        """Response chunks from Ollama's streaming /api/generate"""
+        # No total limit: generation takes as long as it takes, but must keep producing
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=120)
+        
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(self.generate_url, json=payload) as response:
+                response.raise_for_status()
+                # One JSON object per line
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(chunk["error"])
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache_stats,
+            "entries": len(self._cache),
+            "max_entries": self.cache_max_entries,
+            "inflight": len(self._inflight)
+        }
+    
+    def _format_logs(self, logs: List[Dict[str, Any]]) -> str:
+        """Format logs for LLM input, collapsing repeats to fit the prompt token budget"""
+        return compact_logs(logs, settings.RCA_PROMPT_TOKEN_BUDGET)
     
-    def _fallback_analysis(self, logs: List[Dict[str, Any]]) -> str:
+    def fallback_analysis(self, logs: List[Dict[str, Any]]) -> str:
         """Fallback rule-based analysis when LLM is unavailable"""
         error_logs = [log for log in logs if log.get("level") in ["ERROR", "CRITICAL"]]
         
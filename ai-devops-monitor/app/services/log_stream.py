@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set
+from app.utils.config import settings
+
+# Fields pushed to live-tail clients; the full document stays in OpenSearch
+LIVE_FIELDS = ("_id", "timestamp", "level", "service", "message", "is_anomaly", "anomaly_score")
+
+def _parse_filter(values: Optional[Iterable[str]], upper: bool = False) -> Optional[Set[str]]:
+    """Normalize a filter given as a list or comma-separated strings; empty means no filter"""
+    if not values:
+        return None
+    if isinstance(values, str):
+        values = [values]
+    parsed = {
+        (part.strip().upper() if upper else part.strip())
+        for value in values for part in str(value).split(",") if part.strip()
+    }
+    return parsed or None
+
+class LogSubscriber:
+    """One live-tail client: its filters and a bounded queue of pending batches"""
+
+    def __init__(self, levels=None, services=None, max_queue: int = 100):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+        self.set_filters(levels, services)
+
+    def set_filters(self, levels=None, services=None):
+        self.levels = _parse_filter(levels, upper=True)
+        self.services = _parse_filter(services)
+
+    @property
+    def filters(self) -> Dict[str, Optional[List[str]]]:
+        return {
+            "level": sorted(self.levels) if self.levels else None,
+            "service": sorted(self.services) if self.services else None
+        }
+
+    def matches(self, log: Dict[str, Any]) -> bool:
+        if self.levels is not None and log.get("level") not in self.levels:
+            return False
+        if self.services is not None and log.get("service") not in self.services:
+            return False
+        return True
+
+class LogBroadcaster:
+    """
+    Fans newly ingested logs out to live-tail subscribers
+
+    publish() never waits: each subscriber gets the matching part of a
+    batch put on its own bounded queue, and a subscriber whose queue is
+    full is disconnected rather than slowing ingest for everyone.
+    """
+
+    def __init__(self):
+        self.max_clients = settings.LIVE_TAIL_MAX_CLIENTS
+        self.queue_size = settings.LIVE_TAIL_QUEUE_SIZE
+        self.subscribers: Set[LogSubscriber] = set()
+        self.stats = {"published": 0, "delivered": 0, "dropped_clients": 0}
+
+    def subscribe(self, levels=None, services=None) -> LogSubscriber:
+        if len(self.subscribers) >= self.max_clients:
+            raise ConnectionRefusedError(f"Live tail is limited to {self.max_clients} clients")
+        subscriber = LogSubscriber(levels, services, self.queue_size)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LogSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, logs: List[Dict[str, Any]]):
+        """Queue a batch of indexed logs (each with _id) for every matching subscriber"""
+        if not logs or not self.subscribers:
+            return
+        self.stats["published"] += len(logs)
+
+        slim = None
+        for subscriber in list(self.subscribers):
+            matching = [log for log in logs if subscriber.matches(log)]
+            if not matching:
+                continue
+            if slim is None:
+                slim = {id(log): {f: log[f] for f in LIVE_FIELDS if f in log} for log in logs}
+            try:
+                subscriber.queue.put_nowait([slim[id(log)] for log in matching])
+                self.stats["delivered"] += len(matching)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def publish_indexed(self, logs: List[Dict[str, Any]], results: List[Dict[str, Any]]):
+        """Publish the logs of an index_logs call that were written, tagged with their ids"""
+        if not self.subscribers:
+            return
+        written = []
+        for log, result in zip(logs, results):
+            # Copy: the caller's dicts are shared with the other ingest processors
+            if not result.get("error"):
+                written.append({**log, "_id": result.get("_id")})
+        self.publish(written)
+
+    def _drop(self, subscriber: LogSubscriber):
+        """Disconnect a subscriber that stopped keeping up"""
+        self.unsubscribe(subscriber)
+        subscriber.dropped = True
+        self.stats["dropped_clients"] += 1
+        # Discard the backlog and wake the sender with the close marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.subscribers),
+            "max_clients": self.max_clients,
+            "queue_size": self.queue_size,
+            **self.stats
+        }
+
+# Singleton instance
+log_broadcaster = LogBroadcaster()
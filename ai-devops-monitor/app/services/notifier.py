@@ -1,11 +1,20 @@
-import requests
-import smtplib
+import asyncio
+import aiohttp
+import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from app.utils.config import settings
 
 class Notifier:
+    """
+    Delivers alerts to Slack and email
+    
+    Slack posts share one pooled aiohttp session and email reuses one SMTP
+    connection (STARTTLS and login happen once), reconnecting when the
+    server has dropped it.
+    """
+    
     def __init__(self):
         self.slack_webhook = settings.SLACK_WEBHOOK_URL
         self.smtp_config = {
@@ -16,10 +25,23 @@ class Notifier:
             "from_email": settings.SMTP_FROM_EMAIL,
             "to_emails": settings.get_email_recipients()
         }
+        self.timeout = settings.ALERT_SEND_TIMEOUT
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._smtp_lock: Optional[asyncio.Lock] = None
+    
+    def channels(self) -> List[str]:
+        """Channels that are configured"""
+        configured = []
+        if self.slack_webhook:
+            configured.append("slack")
+        if self.smtp_config["host"] and self.smtp_config["to_emails"]:
+            configured.append("email")
+        return configured
     
-    def send_alert(self, alert: Dict[str, Any]) -> Dict[str, bool]:
+    async def send_alert(self, alert: Dict[str, Any]) -> Dict[str, bool]:
         """
-        Send alert via configured channels
+        Send alert via configured channels, concurrently
         Returns status for each channel
         """
         results = {
@@ -27,105 +49,149 @@ class Notifier:
             "email": False
         }
         
-        # Send to Slack
-        if self.slack_webhook:
-            results["slack"] = self._send_slack(alert)
-        
-        # Send via Email
-        if self.smtp_config["host"] and self.smtp_config["to_emails"]:
-            results["email"] = self._send_email(alert)
+        channels = self.channels()
+        outcomes = await asyncio.gather(
+            *[self.deliver(channel, alert) for channel in channels],
+            return_exceptions=True
+        )
+        for channel, outcome in zip(channels, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Failed to send {channel} alert: {outcome}")
+            else:
+                results[channel] = True
         
         return results
     
-    def _send_slack(self, alert: Dict[str, Any]) -> bool:
-        """Send alert to Slack via webhook"""
-        try:
-            # Color code by severity
-            color_map = {
-                "info": "#36a64f",
-                "warning": "#ff9900",
-                "critical": "#ff0000"
-            }
-            color = color_map.get(alert.get("severity", "info"), "#36a64f")
-            
-            payload = {
-                "attachments": [{
-                    "color": color,
-                    "title": alert.get("title", "DevOps Alert"),
-                    "text": alert.get("message", ""),
-                    "fields": [
-                        {
-                            "title": "Severity",
-                            "value": alert.get("severity", "info").upper(),
-                            "short": True
-                        }
-                    ],
-                    "footer": "AI DevOps Monitor",
-                    "ts": int(alert.get("timestamp", 0)) if "timestamp" in alert else None
-                }]
-            }
-            
-            if alert.get("service"):
-                payload["attachments"][0]["fields"].append({
-                    "title": "Service",
-                    "value": alert["service"],
-                    "short": True
-                })
-            
-            response = requests.post(
-                self.slack_webhook,
-                json=payload,
-                timeout=10
+    async def deliver(self, channel: str, alert: Dict[str, Any]):
+        """Send an alert to one channel, raising on failure"""
+        if channel == "slack":
+            await self._send_slack(alert)
+        elif channel == "email":
+            await self._send_email(alert)
+        else:
+            raise ValueError(f"Unknown alert channel '{channel}'")
+    
+    async def close(self):
+        """Close the pooled HTTP session and the SMTP connection"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._smtp is not None and self._smtp.is_connected:
+            try:
+                await self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+        self._smtp = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
             )
-            
-            return response.status_code == 200
+        return self._session
+    
+    async def _send_slack(self, alert: Dict[str, Any]):
+        """Send alert to Slack via webhook"""
+        # Color code by severity
+        color_map = {
+            "info": "#36a64f",
+            "warning": "#ff9900",
+            "critical": "#ff0000"
+        }
+        color = color_map.get(alert.get("severity", "info"), "#36a64f")
+        
+        payload = {
+            "attachments": [{
+                "color": color,
+                "title": alert.get("title", "DevOps Alert"),
+                "text": alert.get("message", ""),
+                "fields": [
+                    {
+                        "title": "Severity",
+                        "value": alert.get("severity", "info").upper(),
+                        "short": True
+                    }
+                ],
+                "footer": "AI DevOps Monitor",
+                "ts": int(alert.get("timestamp", 0)) if "timestamp" in alert else None
+            }]
+        }
+        
+        if alert.get("service"):
+            payload["attachments"][0]["fields"].append({
+                "title": "Service",
+                "value": alert["service"],
+                "short": True
+            })
         
-        except Exception as e:
-            print(f"Failed to send Slack alert: {e}")
-            return False
+        async with self._get_session().post(self.slack_webhook, json=payload) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Slack webhook returned HTTP {response.status}")
     
-    def _send_email(self, alert: Dict[str, Any]) -> bool:
+    async def _send_email(self, alert: Dict[str, Any]):
         """Send alert via email"""
-        try:
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = f"[{alert.get('severity', 'INFO').upper()}] {alert.get('title', 'DevOps Alert')}"
-            msg["From"] = self.smtp_config["from_email"]
-            msg["To"] = ", ".join(self.smtp_config["to_emails"])
-            
-            # HTML body
-            html = f"""
-            <html>
-              <body>
-                <h2>{alert.get('title', 'DevOps Alert')}</h2>
-                <p><strong>Severity:</strong> {alert.get('severity', 'info').upper()}</p>
-                {f"<p><strong>Service:</strong> {alert['service']}</p>" if alert.get('service') else ""}
-                <p><strong>Message:</strong></p>
-                <p>{alert.get('message', '')}</p>
-                <hr>
-                <p><em>Sent by AI DevOps Monitor</em></p>
-              </body>
-            </html>
-            """
-            
-            msg.attach(MIMEText(html, "html"))
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_config["host"], self.smtp_config["port"]) as server:
-                if self.smtp_config["username"] and self.smtp_config["password"]:
-                    server.starttls()
-                    server.login(
-                        self.smtp_config["username"],
-                        self.smtp_config["password"]
-                    )
-                
-                server.send_message(msg)
-            
-            return True
+        # Create message
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = f"[{alert.get('severity', 'INFO').upper()}] {alert.get('title', 'DevOps Alert')}"
+        msg["From"] = self.smtp_config["from_email"]
+        msg["To"] = ", ".join(self.smtp_config["to_emails"])
         
-        except Exception as e:
-            print(f"Failed to send email alert: {e}")
-            return False
+        # HTML body
+        html = f"""
+        <html>
+          <body>
+            <h2>{alert.get('title', 'DevOps Alert')}</h2>
+            <p><strong>Severity:</strong> {alert.get('severity', 'info').upper()}</p>
+            {f"<p><strong>Service:</strong> {alert['service']}</p>" if alert.get('service') else ""}
+            <p><strong>Message:</strong></p>
+            <p>{alert.get('message', '')}</p>
+            <hr>
+            <p><em>Sent by AI DevOps Monitor</em></p>
+          </body>
+        </html>
+        """
+        
+        msg.attach(MIMEText(html, "html"))
+        
+        # Send email over the shared connection, one message at a time
+        if self._smtp_lock is None:
+            self._smtp_lock = asyncio.Lock()
+        async with self._smtp_lock:
+            try:
+                smtp = await self._smtp_connection()
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPTimeoutError:
+                # The connection state is unknown after a timeout
+                self._drop_smtp()
+                raise
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                # The server closed an idle connection; reconnect once
+                self._drop_smtp()
+                smtp = await self._smtp_connection()
+                await smtp.send_message(msg)
+    
+    async def _smtp_connection(self) -> aiosmtplib.SMTP:
+        """The open SMTP connection, connecting and logging in if needed"""
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        
+        login = bool(self.smtp_config["username"] and self.smtp_config["password"])
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_config["host"],
+            port=self.smtp_config["port"],
+            timeout=self.timeout,
+            start_tls=login
+        )
+        await smtp.connect()
+        if login:
+            await smtp.login(self.smtp_config["username"], self.smtp_config["password"])
+        self._smtp = smtp
+        return smtp
+    
+    def _drop_smtp(self):
+        if self._smtp is not None:
+            self._smtp.close()
+        self._smtp = None
 
 # Singleton instance
 notifier = Notifier()
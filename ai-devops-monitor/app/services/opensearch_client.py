@@ -1,18 +1,37 @@
-from opensearchpy import OpenSearch
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from opensearchpy import AsyncOpenSearch, AIOHttpConnection
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from datetime import datetime, timedelta
+import asyncio
+import time
+import uuid
 from app.utils.config import settings
 
+LOG_MAPPINGS = {
+    "properties": {
+        "timestamp": {"type": "date"},
+        "level": {"type": "keyword"},
+        "service": {"type": "keyword"},
+        "message": {"type": "text"},
+        "metadata": {"type": "object"},
+        "processed_at": {"type": "date"},
+        "template_id": {"type": "keyword"},
+        "template": {"type": "keyword", "ignore_above": 1024},
+        "template_params": {"type": "keyword", "ignore_above": 256},
+        "anomaly_score": {"type": "float"},
+        "is_anomaly": {"type": "boolean"},
+        "anomaly_model": {"type": "keyword"}
+    }
+}
+
 class OpenSearchClient:
     def __init__(self):
         self.client = None
         self.index_name = "devops-logs"
-        self._connect()
     
-    def _connect(self):
-        """Initialize OpenSearch connection"""
+    async def connect(self) -> bool:
+        """Initialize the pooled async OpenSearch connection"""
         try:
-            self.client = OpenSearch(
+            self.client = AsyncOpenSearch(
                 hosts=[{
                     'host': settings.OPENSEARCH_HOST,
                     'port': settings.OPENSEARCH_PORT
@@ -20,45 +39,105 @@ class OpenSearchClient:
                 http_auth=(settings.OPENSEARCH_USER, settings.OPENSEARCH_PASSWORD),
                 use_ssl=settings.OPENSEARCH_USE_SSL,
                 verify_certs=False,
-                ssl_show_warn=False
+                ssl_show_warn=False,
+                connection_class=AIOHttpConnection,
+                maxsize=settings.OPENSEARCH_POOL_MAXSIZE,
+                timeout=settings.OPENSEARCH_TIMEOUT,
+                max_retries=settings.OPENSEARCH_MAX_RETRIES,
+                retry_on_timeout=True
             )
             
             # Create index if not exists
-            if not self.client.indices.exists(index=self.index_name):
-                self.client.indices.create(
+            if not await self.client.indices.exists(index=self.index_name):
+                await self.client.indices.create(
                     index=self.index_name,
-                    body={
-                        "mappings": {
-                            "properties": {
-                                "timestamp": {"type": "date"},
-                                "level": {"type": "keyword"},
-                                "service": {"type": "keyword"},
-                                "message": {"type": "text"},
-                                "metadata": {"type": "object"},
-                                "processed_at": {"type": "date"}
-                            }
-                        }
-                    }
+                    body={"mappings": LOG_MAPPINGS}
                 )
+            else:
+                # Add any fields introduced since the index was created
+                await self.client.indices.put_mapping(
+                    index=self.index_name,
+                    body=LOG_MAPPINGS
+                )
+            return True
         except Exception as e:
             print(f"Failed to connect to OpenSearch: {e}")
-            self.client = None
+            await self.close()
+            return False
+    
+    async def close(self):
+        """Close pooled connections"""
+        if self.client is not None:
+            client, self.client = self.client, None
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"Failed to close OpenSearch client: {e}")
     
-    def index_log(self, log: Dict[str, Any]) -> Dict[str, Any]:
+    async def cluster_health(self) -> Dict[str, Any]:
+        """Cluster health summary from _cluster/health"""
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        return await self.client.cluster.health()
+    
+    async def index_log(self, log: Dict[str, Any]) -> Dict[str, Any]:
         """Index a log entry in OpenSearch"""
         if not self.client:
             raise ConnectionError("OpenSearch client not connected")
         
         log["processed_at"] = datetime.utcnow().isoformat()
         
-        response = self.client.index(
+        response = await self.client.index(
             index=self.index_name,
             body=log,
             refresh=True
         )
         return response
     
-    def search_logs(
+    async def index_logs(
+        self,
+        logs: List[Dict[str, Any]],
+        refresh: bool = False,
+        ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Index a batch of log entries with a single _bulk request
+        Returns one result per log, in input order
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        if not logs:
+            return []
+        
+        processed_at = datetime.utcnow().isoformat()
+        body = []
+        for i, log in enumerate(logs):
+            log["processed_at"] = processed_at
+            action = {"_index": self.index_name}
+            if ids:
+                action["_id"] = ids[i]
+            body.append({"index": action})
+            body.append(log)
+        
+        response = await self.client.bulk(body=body, refresh=refresh)
+        
+        results = []
+        for item in response.get("items", []):
+            action = item.get("index", {})
+            error = action.get("error")
+            if isinstance(error, dict):
+                error = f"{error.get('type', 'error')}: {error.get('reason', '')}"
+            results.append({
+                "_id": action.get("_id"),
+                "status": action.get("status"),
+                "error": error
+            })
+        
+        return results
+    
+    async def search_logs(
         self,
         query: Optional[str] = None,
         limit: int = 100,
@@ -69,7 +148,27 @@ class OpenSearchClient:
         if not self.client:
             raise ConnectionError("OpenSearch client not connected")
         
-        # Build query
+        response = await self.client.search(
+            index=self.index_name,
+            body=self._search_body(query, limit, level, service)
+        )
+        
+        logs = []
+        for hit in response["hits"]["hits"]:
+            log = hit["_source"]
+            log["_id"] = hit["_id"]
+            logs.append(log)
+        
+        return logs
+    
+    @staticmethod
+    def _search_body(
+        query: Optional[str] = None,
+        limit: int = 100,
+        level: Optional[str] = None,
+        service: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Query for the latest logs matching the filters, shared by search_logs and _msearch"""
         must_clauses = []
         
         if query:
@@ -96,8 +195,54 @@ class OpenSearchClient:
             "sort": [{"timestamp": {"order": "desc"}}],
             "size": limit
         }
+        return search_body
+    
+    async def update_logs(self, updates: Dict[str, Dict[str, Any]], refresh: bool = False) -> int:
+        """
+        Apply partial updates to existing logs with a single _bulk request
+        Returns the number of documents updated
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        if not updates:
+            return 0
+        
+        body = []
+        for log_id, fields in updates.items():
+            body.append({"update": {"_index": self.index_name, "_id": log_id}})
+            body.append({"doc": fields})
+        
+        response = await self.client.bulk(body=body, refresh=refresh)
+        return sum(1 for item in response.get("items", []) if not item.get("update", {}).get("error"))
+    
+    async def search_unscored_logs(
+        self,
+        model_version: str,
+        limit: int = 100,
+        hours: Optional[int] = None,
+        service: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Latest logs without an anomaly score from the given model version"""
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        filter_clauses = self._time_window(hours)
+        if service:
+            filter_clauses.append({"term": {"service": service}})
+        
+        search_body = {
+            "query": {
+                "bool": {
+                    "filter": filter_clauses,
+                    "must_not": [{"term": {"anomaly_model": model_version}}]
+                }
+            },
+            "sort": [{"timestamp": {"order": "desc"}}],
+            "size": limit
+        }
         
-        response = self.client.search(
+        response = await self.client.search(
             index=self.index_name,
             body=search_body
         )
@@ -110,18 +255,501 @@ class OpenSearchClient:
         
         return logs
     
-    def get_log_by_id(self, log_id: str) -> Optional[Dict[str, Any]]:
+    async def search_anomalies(
+        self,
+        limit: int = 100,
+        hours: Optional[int] = None,
+        service: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Highest-scoring anomalous logs, from the stored is_anomaly/anomaly_score fields
+        Returns the anomalies plus the number of scored and anomalous logs in the window
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        filter_clauses = self._time_window(hours)
+        if service:
+            filter_clauses.append({"term": {"service": service}})
+        
+        search_body = {
+            "query": {"bool": {"filter": filter_clauses}},
+            "post_filter": {"term": {"is_anomaly": True}},
+            "sort": [
+                {"anomaly_score": {"order": "desc", "unmapped_type": "float"}},
+                {"timestamp": {"order": "desc"}}
+            ],
+            "size": limit,
+            "track_total_hits": True,
+            "aggs": {
+                "scored": {"filter": {"exists": {"field": "anomaly_score"}}}
+            }
+        }
+        
+        response = await self.client.search(
+            index=self.index_name,
+            body=search_body
+        )
+        
+        logs = []
+        for hit in response["hits"]["hits"]:
+            log = hit["_source"]
+            log["_id"] = hit["_id"]
+            logs.append(log)
+        
+        return {
+            "logs": logs,
+            "total_anomalies": response["hits"]["total"]["value"],
+            "total_scored": response["aggregations"]["scored"]["doc_count"]
+        }
+    
+    @staticmethod
+    def _time_window(hours: Optional[int]) -> List[Dict[str, Any]]:
+        if not hours:
+            return []
+        since = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
+        return [{"range": {"timestamp": {"gte": since}}}]
+    
+    async def get_template_counts(
+        self,
+        limit: int = 50,
+        level: Optional[str] = None,
+        service: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Count logs per template with a terms aggregation on template_id"""
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        filter_clauses = []
+        if level:
+            filter_clauses.append({"term": {"level": level}})
+        if service:
+            filter_clauses.append({"term": {"service": service}})
+        
+        search_body = {
+            "size": 0,
+            "query": {"bool": {"filter": filter_clauses}},
+            "aggs": {
+                "templates": {
+                    "terms": {"field": "template_id", "size": limit},
+                    "aggs": {
+                        "template": {"terms": {"field": "template", "size": 1}},
+                        "services": {"terms": {"field": "service", "size": 5}}
+                    }
+                }
+            }
+        }
+        
+        response = await self.client.search(
+            index=self.index_name,
+            body=search_body
+        )
+        
+        templates = []
+        for bucket in response["aggregations"]["templates"]["buckets"]:
+            template_buckets = bucket["template"]["buckets"]
+            templates.append({
+                "template_id": bucket["key"],
+                "template": template_buckets[0]["key"] if template_buckets else None,
+                "count": bucket["doc_count"],
+                "services": [b["key"] for b in bucket["services"]["buckets"]]
+            })
+        
+        return templates
+    
+    async def get_summary(
+        self,
+        hours: int = 24,
+        interval_minutes: int = 30,
+        service: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Dashboard summary from a single aggregation query
+        Counts per level and service, anomaly count, and a histogram of error rate
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        filter_clauses = self._time_window(hours)
+        if service:
+            filter_clauses.append({"term": {"service": service}})
+        
+        now = datetime.utcnow()
+        error_filter = {"terms": {"level": ["ERROR", "CRITICAL"]}}
+        search_body = {
+            "size": 0,
+            "track_total_hits": True,
+            "query": {"bool": {"filter": filter_clauses}},
+            "aggs": {
+                "levels": {"terms": {"field": "level", "size": 10}},
+                "services": {
+                    "terms": {"field": "service", "size": 100},
+                    "aggs": {"errors": {"filter": error_filter}}
+                },
+                "anomalies": {"filter": {"term": {"is_anomaly": True}}},
+                "timeline": {
+                    "date_histogram": {
+                        "field": "timestamp",
+                        "fixed_interval": f"{interval_minutes}m",
+                        "min_doc_count": 0,
+                        "extended_bounds": {
+                            "min": (now - timedelta(hours=hours)).isoformat(),
+                            "max": now.isoformat()
+                        }
+                    },
+                    "aggs": {"errors": {"filter": error_filter}}
+                }
+            }
+        }
+        
+        response = await self.client.search(
+            index=self.index_name,
+            body=search_body
+        )
+        aggs = response["aggregations"]
+        
+        timeline = []
+        for bucket in aggs["timeline"]["buckets"]:
+            total = bucket["doc_count"]
+            errors = bucket["errors"]["doc_count"]
+            timeline.append({
+                "timestamp": bucket["key_as_string"],
+                "total": total,
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0.0
+            })
+        
+        return {
+            "total_logs": response["hits"]["total"]["value"],
+            "levels": {b["key"]: b["doc_count"] for b in aggs["levels"]["buckets"]},
+            "services": [
+                {"service": b["key"], "count": b["doc_count"], "errors": b["errors"]["doc_count"]}
+                for b in aggs["services"]["buckets"]
+            ],
+            "anomalies": aggs["anomalies"]["doc_count"],
+            "timeline": timeline
+        }
+    
+    async def get_active_services(self, hours: Optional[int] = 1, max_services: int = 500) -> List[str]:
+        """Services that logged within the last `hours`, busiest first"""
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        search_body = {
+            "size": 0,
+            "query": {"bool": {"filter": self._time_window(hours)}},
+            "aggs": {"services": {"terms": {"field": "service", "size": max_services}}}
+        }
+        
+        response = await self.client.search(
+            index=self.index_name,
+            body=search_body
+        )
+        return [bucket["key"] for bucket in response["aggregations"]["services"]["buckets"]]
+    
+    async def search_logs_by_service(
+        self,
+        services: List[str],
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+        chunk_size: int = 100
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Latest `limit` logs of each service, as search_logs(service=...) returns them,
+        with one _msearch per chunk_size services
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        logs_by_service = {}
+        for start in range(0, len(services), chunk_size):
+            chunk = services[start:start + chunk_size]
+            body = []
+            for service in chunk:
+                search_body = self._search_body(limit=limit, service=service)
+                if fields:
+                    search_body["_source"] = fields
+                body.extend([{"index": self.index_name}, search_body])
+            
+            response = await self.client.msearch(body=body)
+            for service, result in zip(chunk, response["responses"]):
+                if "error" in result:
+                    raise RuntimeError(f"Search for service {service} failed: {result['error']}")
+                logs_by_service[service] = [hit["_source"] for hit in result["hits"]["hits"]]
+        
+        return logs_by_service
+    
+    async def get_log_by_id(self, log_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific log by ID"""
         if not self.client:
             raise ConnectionError("OpenSearch client not connected")
         
         try:
-            response = self.client.get(index=self.index_name, id=log_id)
+            response = await self.client.get(index=self.index_name, id=log_id)
             log = response["_source"]
             log["_id"] = response["_id"]
             return log
         except Exception:
             return None
+    
+    async def get_logs_by_ids(
+        self,
+        log_ids: List[str],
+        fields: Optional[List[str]] = None,
+        chunk_size: int = 1000
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Fetch logs by id with _mget, one request per chunk_size ids
+        fields limits _source to what the caller needs
+        Returns (logs in request order, ids that were not found)
+        """
+        if not self.client:
+            raise ConnectionError("OpenSearch client not connected")
+        
+        # Duplicate ids would return the same document twice
+        unique_ids = list(dict.fromkeys(str(log_id) for log_id in log_ids))
+        logs = []
+        missing = []
+        for start in range(0, len(unique_ids), chunk_size):
+            chunk = unique_ids[start:start + chunk_size]
+            response = await self.client.mget(
+                index=self.index_name,
+                body={"ids": chunk},
+                _source_includes=fields
+            )
+            for doc in response["docs"]:
+                # Documents from a missing index carry an error instead of found
+                if doc.get("found"):
+                    log = doc.get("_source", {})
+                    log["_id"] = doc["_id"]
+                    logs.append(log)
+                else:
+                    missing.append(doc["_id"])
+        
+        return logs, missing
+
+class IngestUnavailableError(Exception):
+    """Raised when the ingest buffer is full and OpenSearch cannot take writes"""
+
+class PendingLog:
+    """A log waiting in the ingest buffer"""
+    __slots__ = ("log_id", "log", "future", "attempts", "processed")
+    
+    def __init__(self, log_id: str, log: Dict[str, Any], future: Optional[asyncio.Future]):
+        self.log_id = log_id
+        self.log = log
+        # Resolved once the log is written, for durable acks
+        self.future = future
+        self.attempts = 0
+        self.processed = False
+
+# Bulk item statuses worth retrying: rejected under load or a failing node
+def _retryable(status: Optional[int]) -> bool:
+    return status is not None and (status == 429 or status >= 500)
+
+class IngestBuffer:
+    """
+    Collects processed logs in memory and writes them with _bulk requests
+    once the batch is full or the flush interval has elapsed
+    
+    Flushing is held while OpenSearch is not connected. Logs whose write
+    fails, either the whole _bulk request or single items rejected with 429
+    or 5xx, go back to the front of the queue and are retried with
+    exponential backoff; they are only given up on after
+    INGEST_BUFFER_MAX_RETRIES attempts. Items rejected with other 4xx
+    statuses (mapping errors) fail at once. Processors run once per log,
+    not again on retries.
+    """
+    
+    def __init__(self, client: OpenSearchClient):
+        self.client = client
+        self.max_batch_size = settings.INGEST_BUFFER_MAX_BATCH
+        self.flush_interval = settings.INGEST_BUFFER_FLUSH_INTERVAL
+        self.max_pending = settings.INGEST_BUFFER_MAX_PENDING
+        self.max_retries = settings.INGEST_BUFFER_MAX_RETRIES
+        self.retry_base_delay = settings.INGEST_BUFFER_RETRY_BASE_DELAY
+        self.retry_max_delay = settings.INGEST_BUFFER_RETRY_MAX_DELAY
+        self._pending: List[PendingLog] = []
+        self._failures = 0
+        self._retry_at = 0.0
+        self._flush_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._processors: List[Callable[[List[Dict[str, Any]]], Awaitable[Any]]] = []
+        self._listeners: List[Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], Any]] = []
+        self.stats = {"queued": 0, "flushed": 0, "failed": 0, "batches": 0, "retried": 0, "rejected": 0}
+    
+    def add_processor(self, processor: Callable[[List[Dict[str, Any]]], Awaitable[Any]]):
+        """Register a coroutine function that enriches each batch in place before it is written"""
+        self._processors.append(processor)
+    
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], Any]):
+        """Register a callback run with (logs, results) after each batch is written; it must not block"""
+        self._listeners.append(listener)
+    
+    async def _process(self, batch: List[PendingLog]):
+        """Enrich the logs of a batch that have not been through the processors yet"""
+        entries = [entry for entry in batch if not entry.processed]
+        if not entries:
+            return
+        logs = [entry.log for entry in entries]
+        for processor in self._processors:
+            await processor(logs)
+        for entry in entries:
+            entry.processed = True
+    
+    async def _write(self, logs: List[Dict[str, Any]], ids: List[str]) -> List[Dict[str, Any]]:
+        """Index one batch"""
+        return await self.client.index_logs(logs, False, ids)
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    @property
+    def writable(self) -> bool:
+        """OpenSearch is connected and the last write has not put the buffer in backoff"""
+        return self.client.client is not None and time.monotonic() >= self._retry_at
+    
+    async def start(self):
+        """Start the background flusher"""
+        if self.running:
+            return
+        self._stopping = False
+        self._flush_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the flusher and drain everything still queued"""
+        if not self.running:
+            return
+        self._stopping = True
+        self._flush_event.set()
+        await self._task
+        self._task = None
+    
+    async def submit(self, log: Dict[str, Any], wait: bool = False) -> str:
+        """
+        Queue a processed log and return its document id
+        With wait=True, return only once the batch holding it is written
+        Raises IngestUnavailableError when the buffer is full and cannot be written
+        """
+        if len(self._pending) >= self.max_pending and not self.writable:
+            self.stats["rejected"] += 1
+            raise IngestUnavailableError(
+                f"OpenSearch is unavailable and {len(self._pending)} logs are already waiting"
+            )
+        
+        log_id = uuid.uuid4().hex
+        # Apply backpressure when the flusher falls behind
+        wait = wait or len(self._pending) >= self.max_pending
+        future = asyncio.get_running_loop().create_future() if wait else None
+        
+        self._pending.append(PendingLog(log_id, log, future))
+        self.stats["queued"] += 1
+        if len(self._pending) >= self.max_batch_size:
+            self._flush_event.set()
+        
+        if future is not None:
+            await future
+        return log_id
+    
+    async def _run(self):
+        """Flush loop: wake on a full batch, after flush_interval or when a retry is due"""
+        while not self._stopping:
+            timeout = self.flush_interval
+            if self._retry_at > time.monotonic():
+                timeout = min(timeout, self._retry_at - time.monotonic())
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            # Hold everything while disconnected or backing off after a failed write
+            while self._pending and self.writable:
+                if not await self._flush():
+                    break
+        
+        # Drain whatever arrived while shutting down, without waiting out the backoff
+        while self._pending and self.client.client is not None:
+            await self._flush()
+        if self._pending:
+            self._give_up(self._pending, ConnectionError("OpenSearch client not connected"))
+            self._pending = []
+    
+    async def _flush(self) -> bool:
+        """Write up to one batch of queued logs; returns False if any of it has to be retried"""
+        batch = self._pending[:self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size:]
+        if not batch:
+            return True
+        
+        try:
+            await self._process(batch)
+            results = await self._write([entry.log for entry in batch], [entry.log_id for entry in batch])
+        except Exception as e:
+            self._requeue(batch, e)
+            return False
+        
+        self.stats["batches"] += 1
+        for listener in self._listeners:
+            try:
+                listener([entry.log for entry in batch], results)
+            except Exception as e:
+                print(f"Ingest listener failed: {e}")
+        
+        retry = []
+        retry_error = None
+        for entry, result in zip(batch, results):
+            error = result.get("error")
+            if error and _retryable(result.get("status")):
+                retry.append(entry)
+                retry_error = error
+                continue
+            
+            if error:
+                self.stats["failed"] += 1
+            else:
+                self.stats["flushed"] += 1
+            if entry.future is not None and not entry.future.done():
+                if error:
+                    entry.future.set_exception(RuntimeError(error))
+                else:
+                    entry.future.set_result(result)
+        
+        if retry:
+            self._requeue(retry, RuntimeError(retry_error))
+            return False
+        
+        self._failures = 0
+        self._retry_at = 0.0
+        return True
+    
+    def _requeue(self, entries: List[PendingLog], error: Exception):
+        """Put logs whose write failed back at the front of the queue and back off"""
+        self._failures += 1
+        delay = min(self.retry_base_delay * 2 ** (self._failures - 1), self.retry_max_delay)
+        self._retry_at = time.monotonic() + delay
+        
+        for entry in entries:
+            entry.attempts += 1
+        exhausted = [entry for entry in entries if entry.attempts >= self.max_retries]
+        retry = [entry for entry in entries if entry.attempts < self.max_retries]
+        self._pending = retry + self._pending
+        self.stats["retried"] += len(retry)
+        print(f"Ingest buffer write failed for {len(entries)} logs, retrying in {delay:.1f}s: {error}")
+        
+        if exhausted:
+            self._give_up(exhausted, error)
+    
+    def _give_up(self, entries: List[PendingLog], error: Exception):
+        """Drop logs that cannot be written, failing any durable acks waiting on them"""
+        print(f"Ingest buffer dropped {len(entries)} logs that could not be written: {error}")
+        self.stats["failed"] += len(entries)
+        for entry in entries:
+            if entry.future is not None and not entry.future.done():
+                entry.future.set_exception(error)
 
 # Singleton instance
 opensearch_client = OpenSearchClient()
+ingest_buffer = IngestBuffer(opensearch_client)
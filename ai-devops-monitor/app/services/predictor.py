@@ -1,31 +1,119 @@
 import numpy as np
 from typing import Dict, Any, List
-import xgboost as xgb
 import pickle
+import json
 import os
+import time
+import threading
 from collections import Counter
 from datetime import datetime, timedelta
+from app.utils.config import settings
+from app.utils.preprocess import ERROR_KEYWORDS
+
+MODEL_PATH = "app/models/predictor_model.ubj"
+METADATA_PATH = "app/models/predictor_model.json"
+LEGACY_MODEL_PATH = "app/models/predictor_model.pkl"
+
+# Column order of the feature matrix; saved with the model and checked on load
+FEATURE_NAMES = [
+    "total_count",
+    "error_count",
+    "warning_count",
+    "error_rate",
+    "warning_rate",
+    "avg_message_length",
+    "keyword_count",
+    "keyword_rate",
+    "service_count",
+    "time_placeholder"
+]
+
+# Log fields _extract_features reads
+LOG_FIELDS = ("level", "message", "service")
 
 class Predictor:
     def __init__(self):
         self.model = None
-        self._load_model()
+        self.model_version = "heuristic"
+        self._loaded = False
+        self._load_lock = threading.Lock()
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+    
+    def ensure_loaded(self):
+        """Load the model on first use"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            self._load_model()
+            self._loaded = True
     
     def _load_model(self):
-        """Load pre-trained XGBoost model or create new one"""
-        model_path = "app/models/predictor_model.pkl"
-        
-        if os.path.exists(model_path) and os.path.getsize(model_path) > 100:
-            try:
-                with open(model_path, 'rb') as f:
+        """Load the XGBoost model from its native format, migrating a legacy pickle if present"""
+        try:
+            if os.path.exists(MODEL_PATH):
+                self._load_native()
+            elif os.path.exists(LEGACY_MODEL_PATH) and os.path.getsize(LEGACY_MODEL_PATH) > 100:
+                with open(LEGACY_MODEL_PATH, 'rb') as f:
                     self.model = pickle.load(f)
-                print("Loaded pre-trained predictor model")
-            except Exception as e:
-                print(f"Failed to load predictor model: {e}. Using heuristic-based prediction.")
+                self._configure(self.model)
+                self.model_version = f"xgboost-{int(os.path.getmtime(LEGACY_MODEL_PATH))}"
+                print("Loaded legacy pickled predictor model, converting to native format")
+                self._save_model()
+            else:
                 self.model = None
-        else:
+                print("No pre-trained model found. Using heuristic-based prediction.")
+        except Exception as e:
+            print(f"Failed to load predictor model: {e}. Using heuristic-based prediction.")
             self.model = None
-            print("No pre-trained model found. Using heuristic-based prediction.")
+            self.model_version = "heuristic"
+    
+    def _load_native(self):
+        """Load a UBJSON booster after checking its feature schema"""
+        import xgboost as xgb
+        
+        metadata = {}
+        if os.path.exists(METADATA_PATH):
+            with open(METADATA_PATH) as f:
+                metadata = json.load(f)
+        
+        feature_names = metadata.get("feature_names")
+        if feature_names is not None and feature_names != FEATURE_NAMES:
+            raise ValueError(f"model expects features {feature_names}, not {FEATURE_NAMES}")
+        
+        model = xgb.Booster()
+        model.load_model(MODEL_PATH)
+        self._configure(model)
+        self.model = model
+        self.model_version = metadata.get("version", f"xgboost-{int(os.path.getmtime(MODEL_PATH))}")
+        print(f"Loaded pre-trained predictor model {self.model_version}")
+    
+    @staticmethod
+    def _configure(model):
+        """Apply inference settings to a booster"""
+        model.set_param({"nthread": settings.PREDICTOR_NTHREAD})
+    
+    def _save_model(self):
+        """Write the booster as UBJSON with its version and feature schema alongside"""
+        import xgboost as xgb
+        
+        os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+        self.model.save_model(MODEL_PATH)
+        
+        metadata = {
+            "version": self.model_version,
+            "feature_names": FEATURE_NAMES,
+            "xgboost_version": xgb.__version__,
+            "saved_at": datetime.utcnow().isoformat()
+        }
+        tmp_path = f"{METADATA_PATH}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, METADATA_PATH)
     
     def _extract_features(self, logs: List[Dict[str, Any]]) -> np.ndarray:
         """Extract time-series features from logs"""
@@ -49,10 +137,9 @@ class Predictor:
         avg_length = np.mean(message_lengths) if message_lengths else 0
         
         # Keywords
-        error_keywords = ["exception", "failed", "error", "timeout", "crash"]
         keyword_count = sum(
             1 for log in logs 
-            if any(kw in log.get("message", "").lower() for kw in error_keywords)
+            if any(kw in log.get("message", "").lower() for kw in ERROR_KEYWORDS)
         )
         keyword_rate = keyword_count / max(total_count, 1)
         
@@ -79,63 +166,79 @@ class Predictor:
         """
         Predict failure probability based on recent logs
         """
+        return self.predict_failures([logs])[0]
+    
+    def predict_failures(self, log_groups: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Predict failure probability for several log windows with one model call
+        """
+        if not log_groups:
+            return []
+        
         try:
-            features = self._extract_features(logs)
-            
-            # If no trained model, use heuristic-based prediction
-            if self.model is None:
-                error_rate = features[0, 3]  # error_rate
-                keyword_rate = features[0, 7]  # keyword_rate
-                
-                # Simple heuristic
-                probability = min((error_rate * 0.6 + keyword_rate * 0.4), 1.0)
-                
-                if probability > 0.7:
-                    prediction = "high_risk"
-                elif probability > 0.4:
-                    prediction = "medium_risk"
-                else:
-                    prediction = "low_risk"
-                
-                confidence = 0.6  # Moderate confidence for heuristic
-            else:
-                # Use trained model
-                dmatrix = xgb.DMatrix(features)
-                probability = float(self.model.predict(dmatrix)[0])
-                
-                if probability > 0.7:
-                    prediction = "high_risk"
-                elif probability > 0.4:
-                    prediction = "medium_risk"
-                else:
-                    prediction = "low_risk"
-                
-                confidence = 0.85
-            
-            return {
-                "prediction": prediction,
-                "probability": float(probability),
-                "confidence": float(confidence),
-                "features": {
-                    "total_logs": int(features[0, 0]),
-                    "error_count": int(features[0, 1]),
-                    "error_rate": float(features[0, 3])
-                }
-            }
+            features = np.vstack([self._extract_features(logs) for logs in log_groups])
+            return self.predict_from_features(features)
         
         except Exception as e:
             print(f"Prediction error: {e}")
-            return {
+            return [{
                 "prediction": "unknown",
                 "probability": 0.0,
                 "confidence": 0.0,
                 "error": str(e)
+            } for _ in log_groups]
+    
+    def predict_from_features(self, features: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Score a feature matrix (one row per log window)
+        """
+        self.ensure_loaded()
+        
+        # If no trained model, use heuristic-based prediction
+        if self.model is None:
+            error_rate = features[:, 3]  # error_rate
+            keyword_rate = features[:, 7]  # keyword_rate
+            
+            # Simple heuristic
+            probabilities = np.minimum(error_rate * 0.6 + keyword_rate * 0.4, 1.0)
+            confidence = 0.6  # Moderate confidence for heuristic
+        else:
+            # Use trained model, skipping DMatrix construction
+            if features.shape[1] != len(FEATURE_NAMES):
+                raise ValueError(f"expected {len(FEATURE_NAMES)} features, got {features.shape[1]}")
+            probabilities = self.model.inplace_predict(
+                np.ascontiguousarray(features, dtype=np.float32)
+            )
+            confidence = 0.85
+        
+        return [
+            {
+                "prediction": self._risk_level(probability),
+                "probability": float(probability),
+                "confidence": float(confidence),
+                "features": {
+                    "total_logs": int(row[0]),
+                    "error_count": int(row[1]),
+                    "error_rate": float(row[3])
+                }
             }
+            for row, probability in zip(features, probabilities)
+        ]
+    
+    @staticmethod
+    def _risk_level(probability: float) -> str:
+        if probability > 0.7:
+            return "high_risk"
+        elif probability > 0.4:
+            return "medium_risk"
+        return "low_risk"
     
     def train(self, X: np.ndarray, y: np.ndarray):
         """Train XGBoost model"""
         try:
-            dtrain = xgb.DMatrix(X, label=y)
+            import xgboost as xgb
+            self.ensure_loaded()
+            dtrain = xgb.DMatrix(np.ascontiguousarray(X, dtype=np.float32), label=y)
             params = {
                 'max_depth': 6,
                 'eta': 0.3,
@@ -143,13 +246,13 @@ class Predictor:
                 'eval_metric': 'logloss'
             }
             
-            self.model = xgb.train(params, dtrain, num_boost_round=100)
+            model = xgb.train(params, dtrain, num_boost_round=100)
+            self._configure(model)
+            self.model = model
+            self.model_version = f"xgboost-{int(time.time())}"
             
             # Save model
-            model_path = "app/models/predictor_model.pkl"
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            with open(model_path, 'wb') as f:
-                pickle.dump(self.model, f)
+            self._save_model()
             
             return True
         except Exception as e:
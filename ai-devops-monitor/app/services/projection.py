@@ -0,0 +1,57 @@
+import numpy as np
+from typing import Optional
+
+class EmbeddingProjection:
+    """
+    Linear projection of sentence embeddings to a compact size
+
+    Fitted as PCA or a Gaussian random projection, then stored as a mean
+    vector and a (input_dim, output_dim) float32 matrix so applying it is
+    one subtraction and one matrix multiply.
+    """
+
+    METHODS = ("pca", "random")
+
+    def __init__(self, method: str = "pca", dim: int = 32, random_state: int = 42):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown projection method '{method}', expected one of {self.METHODS}")
+        self.method = method
+        self.dim = dim
+        self.random_state = random_state
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.components is not None
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[1] if self.fitted else self.dim
+
+    def fit(self, embeddings: np.ndarray) -> "EmbeddingProjection":
+        """Fit on a (rows, input_dim) embedding matrix"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        # PCA cannot produce more components than it has rows or input dims
+        dim = min(self.dim, embeddings.shape[1], max(embeddings.shape[0] - 1, 1))
+
+        if self.method == "pca":
+            from sklearn.decomposition import PCA
+            pca = PCA(n_components=dim, svd_solver="randomized", random_state=self.random_state)
+            pca.fit(embeddings)
+            self.mean = pca.mean_.astype(np.float32)
+            self.components = np.ascontiguousarray(pca.components_.T, dtype=np.float32)
+        else:
+            from sklearn.random_projection import GaussianRandomProjection
+            projection = GaussianRandomProjection(n_components=dim, random_state=self.random_state)
+            projection.fit(embeddings)
+            self.mean = np.zeros(embeddings.shape[1], dtype=np.float32)
+            self.components = np.ascontiguousarray(projection.components_.T, dtype=np.float32)
+
+        return self
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project a (rows, input_dim) matrix to (rows, output_dim) float32"""
+        if not self.fitted:
+            raise RuntimeError("EmbeddingProjection is not fitted")
+        return (np.asarray(embeddings, dtype=np.float32) - self.mean) @ self.components
@@ -0,0 +1,252 @@
+import asyncio
+import itertools
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.services.llm_agent import llm_agent
+from app.utils.config import settings
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+class QueueFullError(Exception):
+    """Raised when the RCA queue already holds RCA_MAX_QUEUED jobs"""
+
+class RCAJob:
+    """One unit of LLM work and its lifecycle timestamps"""
+
+    def __init__(self, priority: str, run: Callable[[], Awaitable[Any]], logs_analyzed: int = 0):
+        self.id = uuid.uuid4().hex
+        self.priority = priority
+        self.run = run
+        self.logs_analyzed = logs_analyzed
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    def to_dict(self) -> Dict[str, Any]:
+        wait_until = self.started_at or time.time()
+        job = {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "logs_analyzed": self.logs_analyzed,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_ms": round((wait_until - self.created_at) * 1000, 1)
+        }
+        if self.status == "completed":
+            job["result"] = self.result
+        if self.error:
+            job["error"] = self.error
+        return job
+
+class RCAJobQueue:
+    """
+    Runs LLM work on a bounded pool of workers
+
+    At most RCA_MAX_CONCURRENCY generations run at once, so bursts queue
+    here instead of piling onto Ollama. Interactive requests are served
+    before batch insights; within a priority, jobs run first in, first out.
+    """
+
+    def __init__(self):
+        self.concurrency = settings.RCA_MAX_CONCURRENCY
+        self.max_queued = settings.RCA_MAX_QUEUED
+        self.retention = settings.RCA_JOB_RETENTION
+        self.jobs: Dict[str, RCAJob] = {}
+        # Unfinished analysis jobs by LLM cache key, so identical requests share one
+        self._analysis_jobs: Dict[str, RCAJob] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._wait_times = deque(maxlen=500)
+        self._run_times = deque(maxlen=500)
+        self.stats = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not worker.done() for worker in self._workers)
+
+    async def start(self):
+        """Start the worker pool"""
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel workers and fail anything still queued or running"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if not job.done.done():
+                self._finish(job, error="RCA queue shut down")
+
+    def submit(self, run: Callable[[], Awaitable[Any]], priority: str = "interactive", logs_analyzed: int = 0) -> RCAJob:
+        """Queue a coroutine function to run on the pool and return its job"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {list(PRIORITIES)}")
+        self._ensure_started()
+        self._prune()
+        if self._queue.qsize() >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"RCA queue is full ({self.max_queued} jobs waiting)")
+
+        job = RCAJob(priority, run, logs_analyzed)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job))
+        self.stats["submitted"] += 1
+        return job
+
+    def submit_analysis(self, logs: List[Dict[str, Any]], context: str = "", priority: str = "interactive") -> RCAJob:
+        """
+        Queue a root cause analysis; the job result is {analysis, cached}
+        An identical analysis that is still queued or running is returned instead of a new job
+        """
+        key = llm_agent.cache_key(logs, context)
+        job = self._analysis_jobs.get(key)
+        if job is not None and not job.done.done():
+            self.stats["coalesced"] += 1
+            if job.status == "queued" and priority in PRIORITIES and PRIORITIES[priority] < PRIORITIES[job.priority]:
+                # Queue it again at the higher priority; the worker skips the stale entry
+                job.priority = priority
+                self._queue.put_nowait((PRIORITIES[priority], next(self._sequence), job))
+            return job
+
+        async def run():
+            analysis, cached = await llm_agent.analyze_logs_cached(logs, context)
+            return {"analysis": analysis, "cached": cached}
+        job = self.submit(run, priority, logs_analyzed=len(logs))
+        self._analysis_jobs[key] = job
+
+        def forget(_):
+            if self._analysis_jobs.get(key) is job:
+                del self._analysis_jobs[key]
+        job.done.add_done_callback(forget)
+        return job
+
+    async def analyze(self, logs: List[Dict[str, Any]], context: str = "", priority: str = "interactive") -> Tuple[str, bool]:
+        """Run a root cause analysis through the pool and wait for it; cache hits skip the queue"""
+        if llm_agent.cached_analysis(logs, context) is not None:
+            return await llm_agent.analyze_logs_cached(logs, context)
+
+        job = self.submit_analysis(logs, context, priority)
+        result = await asyncio.shield(job.done)
+        return result["analysis"], result["cached"]
+
+    async def acquire_slot(self, priority: str = "interactive") -> Tuple[RCAJob, asyncio.Event]:
+        """
+        Wait for a worker and hold it until the returned event is set
+        Used by streaming RCA, which runs in the request instead of the worker
+        """
+        acquired = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            acquired.set()
+            await release.wait()
+
+        job = self.submit(hold, priority)
+        try:
+            await acquired.wait()
+        except BaseException:
+            release.set()
+            raise
+        return job, release
+
+    def get(self, job_id: str) -> Optional[RCAJob]:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            # Finished, or already taken from a higher-priority entry
+            if job.status != "queued":
+                continue
+
+            job.status = "running"
+            job.started_at = time.time()
+            self._wait_times.append(job.started_at - job.created_at)
+            self._running += 1
+            try:
+                result = await job.run()
+            except asyncio.CancelledError:
+                self._finish(job, error="RCA queue shut down")
+                raise
+            except Exception as e:
+                print(f"RCA job {job.id} failed: {e}")
+                self._finish(job, error=str(e))
+            else:
+                self._finish(job, result=result)
+            finally:
+                self._running -= 1
+                self._run_times.append(time.time() - job.started_at)
+
+    def _finish(self, job: RCAJob, result: Any = None, error: Optional[str] = None):
+        job.finished_at = time.time()
+        if error is None:
+            job.status = "completed"
+            job.result = result
+            self.stats["completed"] += 1
+            job.done.set_result(result)
+        else:
+            job.status = "failed"
+            job.error = error
+            self.stats["failed"] += 1
+            job.done.set_exception(RuntimeError(error))
+            # Nobody may be awaiting a polled job; mark the exception retrieved
+            job.done.exception()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    @staticmethod
+    def _percentiles(samples) -> Dict[str, Optional[float]]:
+        if not samples:
+            return {"avg_ms": None, "p95_ms": None, "max_ms": None}
+        ordered = sorted(samples)
+        return {
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+            "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth per priority, running workers and recent wait/run times"""
+        queued = {name: 0 for name in PRIORITIES}
+        for job in self.jobs.values():
+            if job.status == "queued":
+                queued[job.priority] += 1
+
+        return {
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "queued": queued,
+            "queue_depth": sum(queued.values()),
+            "max_queued": self.max_queued,
+            "wait_time": self._percentiles(self._wait_times),
+            "run_time": self._percentiles(self._run_times),
+            **self.stats
+        }
+
+# Singleton instance
+rca_jobs = RCAJobQueue()
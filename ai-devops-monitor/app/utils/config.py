@@ -9,6 +9,53 @@ class Settings(BaseSettings):
     OPENSEARCH_USER: str = "admin"
     OPENSEARCH_PASSWORD: str = "admin"
     OPENSEARCH_USE_SSL: bool = False
+    OPENSEARCH_POOL_MAXSIZE: int = 25
+    OPENSEARCH_TIMEOUT: float = 10.0
+    OPENSEARCH_MAX_RETRIES: int = 2
+    
+    # Ingest
+    INGEST_BULK_MAX_ITEMS: int = 5000
+    INGEST_BUFFER_ENABLED: bool = True
+    INGEST_BUFFER_MAX_BATCH: int = 500
+    INGEST_BUFFER_FLUSH_INTERVAL: float = 1.0
+    INGEST_BUFFER_MAX_PENDING: int = 10000
+    INGEST_BUFFER_MAX_RETRIES: int = 5
+    INGEST_BUFFER_RETRY_BASE_DELAY: float = 0.5
+    INGEST_BUFFER_RETRY_MAX_DELAY: float = 30.0
+    INGEST_DEFAULT_ACK: str = "queued"
+    
+    # Live tail (/ws/logs): connected clients, pending batches per client before it is dropped
+    LIVE_TAIL_MAX_CLIENTS: int = 200
+    LIVE_TAIL_QUEUE_SIZE: int = 100
+    
+    # Template mining
+    TEMPLATE_MINER_ENABLED: bool = True
+    TEMPLATE_MINER_DEPTH: int = 4
+    TEMPLATE_MINER_SIM_THRESHOLD: float = 0.4
+    TEMPLATE_MINER_MAX_CHILDREN: int = 100
+    TEMPLATE_MINER_MAX_CLUSTERS: int = 10000
+    
+    # Text encoder: "sentence-transformers" (PyTorch) or "onnx" (run export_encoder.py first)
+    ENCODER_BACKEND: str = "sentence-transformers"
+    ENCODER_ONNX_PATH: str = "app/models/minilm-onnx/model_int8.onnx"
+    ENCODER_THREADS: int = 0
+    
+    # Embedding cache
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_PATH: str = ""
+    EMBEDDING_CACHE_DISK_ENTRIES: int = 200000
+    
+    # Anomaly scoring
+    ANOMALY_SCORE_AT_INGEST: bool = True
+    ANOMALY_LAZY_SCORE_LIMIT: int = 500
+    # Embedding reduction fitted at training time: "pca", "random" or "none"
+    ANOMALY_PROJECTION: str = "pca"
+    ANOMALY_PROJECTION_DIM: int = 64
+    
+    # Inference batching
+    INFERENCE_MAX_BATCH_SIZE: int = 512
+    INFERENCE_MAX_WAIT_MS: float = 5.0
+    PREDICTOR_NTHREAD: int = 1
     
     # Slack
     SLACK_WEBHOOK_URL: str = ""
@@ -21,10 +68,46 @@ class Settings(BaseSettings):
     SMTP_FROM_EMAIL: str = "devops@example.com"
     ALERT_EMAIL_RECIPIENTS: str = ""
     
+    # Alert outbox: SQLite file, delivery retries with exponential backoff
+    ALERT_OUTBOX_PATH: str = "data/alert_outbox.db"
+    ALERT_OUTBOX_CONCURRENCY: int = 4
+    ALERT_OUTBOX_BUSY_TIMEOUT: float = 10.0
+    ALERT_SEND_TIMEOUT: float = 10.0
+    ALERT_MAX_ATTEMPTS: int = 5
+    ALERT_RETRY_BASE_DELAY: float = 2.0
+    ALERT_RETRY_MAX_DELAY: float = 300.0
+    ALERT_RETENTION: float = 604800.0
+    ALERT_LEASE_SECONDS: float = 60.0
+    
+    # Alert dedup: coalescing window per (service, severity, title), per-channel rate limit
+    ALERT_DEDUP_WINDOW: float = 300.0
+    ALERT_RATE_LIMIT_PER_MINUTE: float = 20.0
+    ALERT_RATE_BURST: int = 10
+    
     # LLM
     OLLAMA_BASE_URL: str = "http://ollama:11434"
     OLLAMA_MODEL: str = "mistral"
     
+    # RCA result cache
+    RCA_CACHE_TTL: float = 600.0
+    RCA_CACHE_MAX_ENTRIES: int = 256
+    
+    # RCA job queue
+    RCA_MAX_CONCURRENCY: int = 2
+    RCA_MAX_QUEUED: int = 100
+    RCA_JOB_RETENTION: float = 3600.0
+    
+    # RCA prompt: approximate token budget for the compacted log section
+    RCA_PROMPT_TOKEN_BUDGET: int = 1500
+    
+    # Dashboard summary
+    SUMMARY_CACHE_TTL: float = 5.0
+    
+    # Startup and health
+    WARMUP_MODELS: bool = True
+    HEALTH_CACHE_TTL: float = 5.0
+    HEALTH_PROBE_TIMEOUT: float = 2.0
+    
     # Backend
     BACKEND_HOST: str = "0.0.0.0"
     BACKEND_PORT: int = 8000
@@ -0,0 +1,99 @@
+from typing import Dict, Any, List, Tuple
+from app.utils.template_miner import mask_token
+
+SEVERITY = {"CRITICAL": 0, "ERROR": 1, "WARNING": 2, "WARN": 2, "INFO": 3, "DEBUG": 4}
+
+# Rough token estimate for Mistral-style tokenizers on English log text
+CHARS_PER_TOKEN = 4
+# Keep one huge message (a stack trace) from taking the whole budget
+MAX_LINE_CHARS = 400
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def _normalize(log: Dict[str, Any]) -> Tuple[str, str]:
+    """Grouping key and display text for a log's message"""
+    # Indexed logs carry a mined template; otherwise mask parameter-like tokens the same way
+    if log.get("template_id") and log.get("template"):
+        return log["template_id"], log["template"]
+    masked = " ".join(mask_token(token) for token in str(log.get("message", "")).split())
+    return masked, masked
+
+def _group(logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for log in logs:
+        key, template = _normalize(log)
+        service = log.get("service", "unknown")
+        level = str(log.get("level", "INFO")).upper()
+        timestamp = str(log.get("timestamp") or "")
+        group = groups.get((service, key))
+        if group is None:
+            groups[(service, key)] = {
+                "service": service,
+                "template": template,
+                "message": log.get("message", ""),
+                "level": level,
+                "count": 1,
+                "first_seen": timestamp,
+                "last_seen": timestamp
+            }
+            continue
+        group["count"] += 1
+        if SEVERITY.get(level, 3) < SEVERITY.get(group["level"], 3):
+            group["level"] = level
+        if timestamp and (not group["first_seen"] or timestamp < group["first_seen"]):
+            group["first_seen"] = timestamp
+        if timestamp > group["last_seen"]:
+            group["last_seen"] = timestamp
+    return list(groups.values())
+
+def _format_group(group: Dict[str, Any]) -> str:
+    if group["count"] == 1:
+        line = f"[{group['first_seen'] or 'N/A'}] {group['level']} - {group['service']}: {group['message']}"
+    else:
+        line = (
+            f"{group['count']}× [{group['first_seen'] or 'N/A'} → {group['last_seen'] or 'N/A'}] "
+            f"{group['level']} - {group['service']}: {group['template']}"
+        )
+    if len(line) > MAX_LINE_CHARS:
+        line = line[:MAX_LINE_CHARS - 3] + "..."
+    return line
+
+def compact_logs(logs: List[Dict[str, Any]], token_budget: int) -> str:
+    """
+    Render logs for an LLM prompt within a token budget
+
+    Logs are grouped by service and normalized message, so repeats collapse
+    into one "N× template (first/last seen)" line. Groups are admitted by
+    severity, then most recent first, until the budget is spent; admitted
+    lines are printed in order of first occurrence so the incident reads as
+    a timeline.
+    """
+    if not logs:
+        return ""
+
+    groups = _group(logs)
+    header = f"{len(logs)} log(s) in {len(groups)} distinct message group(s)"
+    used = estimate_tokens(header)
+
+    # Most recent first within a severity: sort by recency, then stably by severity
+    ranked = sorted(groups, key=lambda g: g["last_seen"], reverse=True)
+    ranked.sort(key=lambda g: SEVERITY.get(g["level"], 3))
+
+    selected = []
+    for group in ranked:
+        line = _format_group(group)
+        cost = estimate_tokens(line)
+        if used + cost > token_budget and selected:
+            break
+        selected.append((group, line))
+        used += cost
+
+    selected.sort(key=lambda item: item[0]["first_seen"])
+    lines = [header] + [f"{i}. {line}" for i, (_, line) in enumerate(selected, 1)]
+
+    omitted = len(groups) - len(selected)
+    if omitted:
+        omitted_logs = len(logs) - sum(group["count"] for group, _ in selected)
+        lines.append(f"... {omitted} lower-priority group(s) ({omitted_logs} log(s)) omitted")
+    return "\n".join(lines)
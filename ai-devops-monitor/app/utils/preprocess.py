@@ -1,6 +1,21 @@
 import re
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Callable, Optional
+from app.utils.config import settings
+from app.utils.template_miner import TemplateMiner
+from app.utils.timestamps import timestamp_normalizer
+
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Keywords the failure predictor counts
+ERROR_KEYWORDS = ["exception", "failed", "error", "timeout", "crash"]
+
+template_miner = TemplateMiner(
+    depth=settings.TEMPLATE_MINER_DEPTH,
+    sim_threshold=settings.TEMPLATE_MINER_SIM_THRESHOLD,
+    max_children=settings.TEMPLATE_MINER_MAX_CHILDREN,
+    max_clusters=settings.TEMPLATE_MINER_MAX_CLUSTERS
+)
 
 def preprocess_log(log: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -9,11 +24,28 @@ def preprocess_log(log: Dict[str, Any]) -> Dict[str, Any]:
     processed = log.copy()
     
     # Normalize timestamp
-    if "timestamp" in processed:
-        processed["timestamp"] = normalize_timestamp(processed["timestamp"])
-    else:
-        processed["timestamp"] = datetime.utcnow().isoformat()
+    processed["timestamp"] = normalize_timestamp(processed.get("timestamp"), processed.get("service"))
+    
+    return _preprocess_fields(processed)
+
+def preprocess_logs(logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Preprocess a batch of log entries
+    """
+    processed_logs = [log.copy() for log in logs]
+    
+    # Normalize the timestamp column in one call
+    timestamps = timestamp_normalizer.normalize_many(
+        [log.get("timestamp") for log in processed_logs],
+        [log.get("service") for log in processed_logs]
+    )
+    for processed, timestamp in zip(processed_logs, timestamps):
+        processed["timestamp"] = timestamp
     
+    return [_preprocess_fields(processed) for processed in processed_logs]
+
+def _preprocess_fields(processed: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize level, clean the message and extract derived fields in place"""
     # Normalize level
     if "level" in processed:
         processed["level"] = processed["level"].upper()
@@ -25,74 +57,107 @@ def preprocess_log(log: Dict[str, Any]) -> Dict[str, Any]:
     # Extract additional fields from message
     processed["extracted_fields"] = extract_fields(processed.get("message", ""))
     
+    # Assign a template id and parameters
+    if settings.TEMPLATE_MINER_ENABLED:
+        processed.update(template_miner.add_message(processed.get("message", "")))
+    
     return processed
 
-def normalize_timestamp(timestamp: str) -> str:
-    """Normalize timestamp to ISO format"""
-    try:
-        # Try parsing common formats
-        formats = [
-            "%Y-%m-%dT%H:%M:%S.%fZ",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S",
-            "%d/%b/%Y:%H:%M:%S",
-        ]
-        
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(timestamp, fmt)
-                return dt.isoformat()
-            except ValueError:
-                continue
-        
-        # If all formats fail, return as-is
-        return timestamp
-    except Exception:
-        return datetime.utcnow().isoformat()
+def normalize_timestamp(timestamp: Any, source: Optional[str] = None) -> Any:
+    """Normalize timestamp to UTC ISO format, remembering the format per source"""
+    return timestamp_normalizer.normalize(timestamp, source)
 
 def clean_message(message: str) -> str:
     """Clean and normalize log message"""
-    # Remove excessive whitespace
-    message = re.sub(r'\s+', ' ', message)
-    
-    # Trim
-    message = message.strip()
+    # Collapse whitespace and trim
+    message = " ".join(message.split())
     
     # Remove ANSI color codes
-    message = re.sub(r'\x1b\[[0-9;]*m', '', message)
+    if "\x1b" in message:
+        message = ANSI_PATTERN.sub('', message)
     
     return message
 
-def extract_fields(message: str) -> Dict[str, Any]:
-    """Extract structured fields from log message"""
-    fields = {}
-    
-    # Extract IP addresses
-    ip_pattern = r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-    ips = re.findall(ip_pattern, message)
-    if ips:
-        fields["ip_addresses"] = ips
+class FieldExtractor:
+    """
+    Extracts structured fields from a message with precompiled patterns
     
-    # Extract URLs
-    url_pattern = r'https?://[^\s]+'
-    urls = re.findall(url_pattern, message)
-    if urls:
-        fields["urls"] = urls
+    Each field is scanned with its own pattern, so one span can feed several
+    fields (an IP and a status code inside a URL are reported as well as the
+    URL). A field's regex is skipped when the message lacks what every match
+    needs, such as a digit or a substring. Keys follow registration order.
+    """
     
-    # Extract error codes
-    error_code_pattern = r'\b[4-5]\d{2}\b'
-    error_codes = re.findall(error_code_pattern, message)
-    if error_codes:
-        fields["http_status_codes"] = error_codes
+    def __init__(self):
+        self._fields = []
     
-    # Extract stack traces
-    if "Traceback" in message or "Exception" in message:
-        fields["has_stacktrace"] = True
+    def add_pattern(
+        self,
+        field: str,
+        pattern: str,
+        transform: Optional[Callable[[str], Any]] = None,
+        needs_digit: bool = False,
+        needs_substring: Optional[str] = None,
+        lowercase: bool = False
+    ):
+        """
+        Register a list-valued field
+        needs_digit/needs_substring declare what a message must contain to match,
+        lowercase scans the lowercased message
+        """
+        self._fields.append(("pattern", field, re.compile(pattern), transform, needs_digit, needs_substring, lowercase))
     
-    # Extract duration/latency
-    duration_pattern = r'(\d+(?:\.\d+)?)\s*(ms|sec|seconds?|minutes?)'
-    durations = re.findall(duration_pattern, message.lower())
-    if durations:
-        fields["durations"] = [f"{d[0]}{d[1]}" for d in durations]
+    def add_flag(self, field: str, substrings: List[str]):
+        """Register a boolean field set when any substring occurs in the message"""
+        self._fields.append(("flag", field, tuple(substrings)))
     
-    return fields
+    def extract(self, message: str) -> Dict[str, Any]:
+        """Extract all registered fields from a message"""
+        found = {}
+        has_digit = None
+        lowered = None
+        for entry in self._fields:
+            if entry[0] == "flag":
+                if any(s in message for s in entry[2]):
+                    found[entry[1]] = True
+                continue
+            
+            _, field, regex, transform, needs_digit, needs_substring, lowercase = entry
+            if needs_digit:
+                if has_digit is None:
+                    has_digit = DIGIT_PATTERN.search(message) is not None
+                if not has_digit:
+                    continue
+            if needs_substring and needs_substring not in message:
+                continue
+            if lowercase:
+                if lowered is None:
+                    lowered = message.lower()
+                text = lowered
+            else:
+                text = message
+            
+            values = [match.group() for match in regex.finditer(text)]
+            if values:
+                found[field] = [transform(v) for v in values] if transform is not None else values
+        return found
+
+def _normalize_duration(value: str) -> str:
+    return "".join(value.split())
+
+field_extractor = FieldExtractor()
+field_extractor.add_pattern("ip_addresses", r'\b(?:\d{1,3}\.){3}\d{1,3}\b', needs_digit=True)
+field_extractor.add_pattern("urls", r'https?://[^\s]+', needs_substring="http")
+field_extractor.add_pattern("http_status_codes", r'\b[4-5]\d{2}\b', needs_digit=True)
+field_extractor.add_flag("has_stacktrace", ["Traceback", "Exception"])
+field_extractor.add_pattern(
+    "durations",
+    r'\d+(?:\.\d+)?\s*(?:ms|sec|seconds?|minutes?)',
+    transform=_normalize_duration,
+    needs_digit=True,
+    lowercase=True
+)
+
+def extract_fields(message: str) -> Dict[str, Any]:
+    """Extract structured fields from log message"""
+    return field_extractor.extract(message)
@@ -0,0 +1,54 @@
+import time
+from typing import Dict, Any, Optional
+
+class Readiness:
+    """
+    Tracks startup phases and which subsystems are warm
+    States: pending -> warming -> ready | failed
+    """
+    
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.subsystems: Dict[str, Dict[str, Any]] = {}
+    
+    def register(self, name: str):
+        self.subsystems.setdefault(name, {"state": "pending", "duration_ms": None, "error": None})
+    
+    def warming(self, name: str):
+        self.register(name)
+        self.subsystems[name].update({"state": "warming", "_start": time.monotonic()})
+    
+    def ready(self, name: str):
+        self._finish(name, "ready")
+    
+    def failed(self, name: str, error: Optional[str] = None):
+        self._finish(name, "failed", error)
+    
+    def _finish(self, name: str, state: str, error: Optional[str] = None):
+        self.register(name)
+        entry = self.subsystems[name]
+        start = entry.pop("_start", None)
+        entry["state"] = state
+        entry["error"] = error
+        if start is not None:
+            entry["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+        print(f"Startup: {name} {state}" + (f" in {entry['duration_ms']} ms" if entry["duration_ms"] is not None else ""))
+    
+    def is_ready(self, name: str) -> bool:
+        return self.subsystems.get(name, {}).get("state") == "ready"
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Public view of every subsystem state and the time since startup"""
+        return {
+            "uptime_s": round(time.monotonic() - self.started_at, 1),
+            "all_ready": bool(self.subsystems) and all(
+                entry["state"] == "ready" for entry in self.subsystems.values()
+            ),
+            "subsystems": {
+                name: {k: v for k, v in entry.items() if not k.startswith("_")}
+                for name, entry in self.subsystems.items()
+            }
+        }
+
+# Singleton instance
+readiness = Readiness()
@@ -0,0 +1,200 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+WILDCARD = "<*>"
+
+def mask_token(token: str) -> str:
+    """Treat any token containing a digit as a parameter"""
+    return WILDCARD if any(c.isdigit() for c in token) else token
+
+class LogCluster:
+    """A group of messages sharing one template"""
+    __slots__ = ("template_id", "tokens", "size", "node")
+
+    def __init__(self, template_id: str, tokens: List[str]):
+        self.template_id = template_id
+        self.tokens = tokens
+        self.size = 0
+        # Leaf of the parse tree holding this cluster, so it can be evicted
+        self.node: Optional["Node"] = None
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+class Node:
+    """Internal node of the fixed-depth parse tree"""
+    __slots__ = ("children", "clusters")
+
+    def __init__(self):
+        self.children: Dict[str, "Node"] = {}
+        self.clusters: List[LogCluster] = []
+
+class TemplateMiner:
+    """
+    Online log template miner using a Drain-style fixed-depth parse tree
+
+    Messages are routed by token count and then by their leading tokens,
+    so only a handful of candidate templates are compared per message.
+    A template id is a hash of the current template, so it does not depend
+    on which message happened to start the cluster: when a later message
+    widens the template with wildcards, the cluster is re-keyed, and every
+    process that has seen the same messages settles on the same id. The old
+    id is kept as an alias, so counts stored under it can be folded into the
+    current template.
+
+    At most max_clusters templates are kept; the least recently matched one
+    is evicted when a new template would exceed the cap.
+    """
+
+    def __init__(self, depth: int = 4, sim_threshold: float = 0.4, max_children: int = 100, max_clusters: int = 10000):
+        # Depth counts the root and length layers, so at least one token layer remains
+        self.depth = max(depth, 3)
+        self.sim_threshold = sim_threshold
+        self.max_children = max_children
+        self.max_clusters = max(max_clusters, 1)
+        self.root = Node()
+        # Least recently matched first
+        self.clusters: "OrderedDict[LogCluster, None]" = OrderedDict()
+        # Ids a cluster had before it widened, pointing at the id it was given next
+        self.aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _template_id(tokens: List[str]) -> str:
+        return hashlib.blake2b(" ".join(tokens).encode("utf-8"), digest_size=8).hexdigest()
+
+    def _prefix(self, tokens: List[str]) -> List[str]:
+        return tokens[:self.depth - 2]
+
+    def _search(self, tokens: List[str]) -> Optional[LogCluster]:
+        """Find the most similar cluster for a masked token list"""
+        node = self.root.children.get(str(len(tokens)))
+        if node is None:
+            return None
+
+        for token in self._prefix(tokens):
+            child = node.children.get(token) or node.children.get(WILDCARD)
+            if child is None:
+                return None
+            node = child
+
+        best, best_sim, best_params = None, -1.0, -1
+        for cluster in node.clusters:
+            sim, params = self._similarity(cluster.tokens, tokens)
+            if sim > best_sim or (sim == best_sim and params > best_params):
+                best, best_sim, best_params = cluster, sim, params
+
+        if best is not None and best_sim >= self.sim_threshold:
+            return best
+        return None
+
+    @staticmethod
+    def _similarity(template: List[str], tokens: List[str]):
+        if not tokens:
+            return 1.0, 0
+        same = 0
+        params = 0
+        for t1, t2 in zip(template, tokens):
+            if t1 == WILDCARD:
+                params += 1
+            elif t1 == t2:
+                same += 1
+        return same / len(tokens), params
+
+    def _insert(self, cluster: LogCluster):
+        """Add a new cluster to the tree, growing inner nodes as needed"""
+        node = self.root.children.setdefault(str(len(cluster.tokens)), Node())
+
+        for token in self._prefix(cluster.tokens):
+            if token in node.children:
+                node = node.children[token]
+            elif token != WILDCARD and len(node.children) < self.max_children:
+                node = node.children.setdefault(token, Node())
+            else:
+                node = node.children.setdefault(WILDCARD, Node())
+
+        node.clusters.append(cluster)
+        cluster.node = node
+
+    def _evict(self):
+        """Drop least recently matched clusters beyond max_clusters"""
+        while len(self.clusters) > self.max_clusters:
+            cluster, _ = self.clusters.popitem(last=False)
+            cluster.node.clusters.remove(cluster)
+        while len(self.aliases) > self.max_clusters:
+            self.aliases.popitem(last=False)
+
+    def add_message(self, message: str) -> Dict[str, Any]:
+        """
+        Match a message against known templates, learning a new one if needed
+        Returns the template id, template text and extracted parameters
+        """
+        tokens = message.split()
+        masked = [mask_token(token) for token in tokens]
+
+        with self._lock:
+            cluster = self._search(masked)
+            if cluster is None:
+                cluster = LogCluster(self._template_id(masked), masked)
+                self.clusters[cluster] = None
+                self._insert(cluster)
+            else:
+                self.clusters.move_to_end(cluster)
+                widened = [
+                    t1 if t1 == t2 else WILDCARD
+                    for t1, t2 in zip(cluster.tokens, masked)
+                ]
+                if widened != cluster.tokens:
+                    cluster.tokens = widened
+                    new_id = self._template_id(widened)
+                    self.aliases[cluster.template_id] = new_id
+                    cluster.template_id = new_id
+            cluster.size += 1
+            template_tokens = cluster.tokens
+            self._evict()
+
+        return {
+            "template_id": cluster.template_id,
+            "template": " ".join(template_tokens),
+            "template_params": [
+                token for token, template_token in zip(tokens, template_tokens)
+                if template_token == WILDCARD
+            ]
+        }
+
+    def resolve(self, template_id: str) -> str:
+        """Current id of a template that may have widened since template_id was assigned"""
+        with self._lock:
+            seen = set()
+            while template_id in self.aliases and template_id not in seen:
+                seen.add(template_id)
+                template_id = self.aliases[template_id]
+        return template_id
+
+    def merge_counts(self, templates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fold template counts stored under ids that have since widened into their current id
+        Takes and returns template_id/template/count/services dicts, most frequent first
+        """
+        with self._lock:
+            current = {cluster.template_id: cluster.template for cluster in self.clusters}
+        merged: Dict[str, Dict[str, Any]] = {}
+        for entry in templates:
+            template_id = self.resolve(entry["template_id"])
+            target = merged.get(template_id)
+            if target is None:
+                merged[template_id] = {
+                    **entry,
+                    "template_id": template_id,
+                    "template": current.get(template_id, entry.get("template")),
+                    "services": list(entry.get("services", []))
+                }
+                continue
+            target["count"] += entry["count"]
+            for service in entry.get("services", []):
+                if service not in target["services"]:
+                    target["services"].append(service)
+        return sorted(merged.values(), key=lambda t: t["count"], reverse=True)
@@ -0,0 +1,162 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone, timedelta
+
+MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
+}
+
+EPOCH_PATTERN = re.compile(r'^\d+(?:\.\d+)?$')
+RFC5424_PATTERN = re.compile(r'^<\d{1,3}>\d{1,2} (\S+)')
+RFC3164_PATTERN = re.compile(r'^(?:<\d{1,3}>)?([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})')
+CLF_PATTERN = re.compile(r'^(\d{2})/([A-Z][a-z]{2})/(\d{4}):(\d{2}):(\d{2}):(\d{2})(?: ([+-])(\d{2})(\d{2}))?')
+
+def _to_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes as UTC and convert aware ones to UTC"""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+def parse_iso(value: Any) -> datetime:
+    """ISO 8601 / RFC 3339, including a trailing Z"""
+    if not isinstance(value, str) or EPOCH_PATTERN.match(value):
+        raise ValueError("not an ISO timestamp")
+    return _to_utc(datetime.fromisoformat(value))
+
+def parse_epoch(value: Any) -> datetime:
+    """Epoch seconds, milliseconds or microseconds"""
+    if isinstance(value, bool):
+        raise ValueError("not an epoch timestamp")
+    if isinstance(value, str):
+        if not EPOCH_PATTERN.match(value):
+            raise ValueError("not an epoch timestamp")
+        value = float(value)
+    elif not isinstance(value, (int, float)):
+        raise ValueError("not an epoch timestamp")
+
+    if value >= 1e14:
+        value /= 1e6
+    elif value >= 1e11:
+        value /= 1e3
+    return datetime.fromtimestamp(value, tz=timezone.utc)
+
+def parse_rfc5424(value: Any) -> datetime:
+    """Syslog RFC 5424 header: <PRI>VERSION TIMESTAMP ..."""
+    match = RFC5424_PATTERN.match(value) if isinstance(value, str) else None
+    if not match:
+        raise ValueError("not an RFC 5424 timestamp")
+    return _to_utc(datetime.fromisoformat(match.group(1)))
+
+def parse_rfc3164(value: Any) -> datetime:
+    """Syslog RFC 3164 'Mmm dd hh:mm:ss' without a year, assumed UTC"""
+    match = RFC3164_PATTERN.match(value) if isinstance(value, str) else None
+    if not match or match.group(1) not in MONTHS:
+        raise ValueError("not an RFC 3164 timestamp")
+
+    now = datetime.now(timezone.utc)
+    month, day, hour, minute, second = MONTHS[match.group(1)], *map(int, match.groups()[1:])
+    dt = datetime(now.year, month, day, hour, minute, second, tzinfo=timezone.utc)
+    # No year in the format: a date in the future belongs to last year
+    if dt > now + timedelta(days=1):
+        dt = dt.replace(year=now.year - 1)
+    return dt
+
+def parse_clf(value: Any) -> datetime:
+    """Common Log Format '10/Oct/2000:13:55:36 -0700'"""
+    match = CLF_PATTERN.match(value) if isinstance(value, str) else None
+    if not match or match.group(2) not in MONTHS:
+        raise ValueError("not a CLF timestamp")
+
+    day, month, year, hour, minute, second, sign, off_h, off_m = match.groups()
+    tz = timezone.utc
+    if sign:
+        offset = timedelta(hours=int(off_h), minutes=int(off_m))
+        tz = timezone(offset if sign == "+" else -offset)
+    dt = datetime(int(year), MONTHS[month], int(day), int(hour), int(minute), int(second), tzinfo=tz)
+    return dt.astimezone(timezone.utc)
+
+class TimestampNormalizer:
+    """
+    Parses timestamps in the formats our shippers send and renders them as UTC ISO 8601
+
+    Parsers are tried in order, starting with the one that last succeeded
+    for the same source, so a service that always sends the same format
+    costs a single parse attempt per log.
+    """
+
+    def __init__(self, max_sources: int = 1024):
+        self.parsers: Dict[str, Callable[[Any], datetime]] = {
+            "iso": parse_iso,
+            "epoch": parse_epoch,
+            "rfc5424": parse_rfc5424,
+            "rfc3164": parse_rfc3164,
+            "clf": parse_clf
+        }
+        self.max_sources = max_sources
+        self._source_formats: Dict[str, str] = {}
+
+    def _parse(self, value: Any, preferred: Optional[str] = None) -> Tuple[Optional[datetime], Optional[str]]:
+        """Try the preferred parser first, then the rest in order"""
+        if isinstance(value, str):
+            value = value.strip()
+
+        if preferred:
+            try:
+                return self.parsers[preferred](value), preferred
+            except (ValueError, OverflowError, OSError):
+                pass
+
+        for name, parser in self.parsers.items():
+            if name == preferred:
+                continue
+            try:
+                return parser(value), name
+            except (ValueError, OverflowError, OSError):
+                continue
+
+        return None, None
+
+    def parse(self, value: Any, source: Optional[str] = None) -> Optional[datetime]:
+        """Parse a timestamp to an aware UTC datetime, or None if no format matches"""
+        cached = self._source_formats.get(source) if source is not None else None
+        dt, name = self._parse(value, cached)
+
+        if name and name != cached and source is not None:
+            if source in self._source_formats or len(self._source_formats) < self.max_sources:
+                self._source_formats[source] = name
+        return dt
+
+    def normalize(self, value: Any, source: Optional[str] = None) -> Any:
+        """
+        Normalize a timestamp to UTC ISO 8601
+        Missing values become the current time; unparseable values are returned as-is
+        """
+        if value is None or value == "":
+            return datetime.now(timezone.utc).isoformat()
+
+        dt = self.parse(value, source)
+        return dt.isoformat() if dt is not None else value
+
+    def normalize_many(self, values: List[Any], sources: Optional[List[Optional[str]]] = None) -> List[Any]:
+        """
+        Normalize a column of timestamps
+        Without sources, the whole column shares one format cache
+        """
+        if sources is not None:
+            return [self.normalize(value, source) for value, source in zip(values, sources)]
+
+        now = datetime.now(timezone.utc).isoformat()
+        normalized = []
+        last = None
+        for value in values:
+            if value is None or value == "":
+                normalized.append(now)
+                continue
+            dt, name = self._parse(value, last)
+            last = name or last
+            normalized.append(dt.isoformat() if dt is not None else value)
+        return normalized
+
+# Singleton instance
+timestamp_normalizer = TimestampNormalizer()
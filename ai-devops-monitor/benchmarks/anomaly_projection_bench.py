@@ -0,0 +1,99 @@
+"""
+Latency and detection quality of the embedding projection before IsolationForest
+
+Embeds generated logs once, then for each projection setting fits the
+projection and an IForest on the training split and scores the test
+split. Logs from the ERROR/CRITICAL templates count as anomalies for
+ROC AUC. Uses the configured encoder when it can be loaded, otherwise a
+hashed bag-of-words stand-in (reported in the output).
+
+Usage (from the ai-devops-monitor directory):
+    python benchmarks/anomaly_projection_bench.py [num_logs]
+"""
+import os
+import sys
+import time
+import random
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_logs import generate_log
+from app.utils.config import settings
+from app.utils.preprocess import clean_message
+from app.services.anomaly_detector import LEVEL_ENCODING
+from app.services.projection import EmbeddingProjection
+
+SETTINGS = [("none", None), ("pca", 64), ("pca", 32), ("pca", 16), ("pca", 8), ("random", 64), ("random", 32)]
+
+class HashingEncoder:
+    """Stand-in 384-dim encoder: mean of per-token random vectors"""
+    name = "hashing stand-in"
+
+    def encode(self, messages):
+        vectors = np.zeros((len(messages), 384), dtype=np.float32)
+        for row, message in enumerate(messages):
+            for token in message.lower().split():
+                seed = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=4).digest(), "little")
+                vectors[row] += np.random.default_rng(seed).standard_normal(384).astype(np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+def get_encoder():
+    try:
+        from app.services.encoders import load_encoder
+        return load_encoder(settings.ENCODER_BACKEND, settings.ENCODER_ONNX_PATH, settings.ENCODER_THREADS)
+    except Exception:
+        return HashingEncoder()
+
+def main():
+    from pyod.models.iforest import IForest
+    from sklearn.metrics import roc_auc_score
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    random.seed(42)
+    now = datetime.utcnow()
+    logs = [generate_log(i, now) for i in range(count)]
+    messages = [clean_message(log["message"]) for log in logs]
+    labels = np.array([log["level"] in ("ERROR", "CRITICAL") for log in logs])
+
+    encoder = get_encoder()
+    embeddings = encoder.encode(messages).astype(np.float32)
+    extra = np.column_stack([
+        [LEVEL_ENCODING.get(log["level"], 1) for log in logs],
+        [len(m) for m in messages]
+    ]).astype(np.float32)
+
+    split = count * 2 // 3
+    print(f"{count} logs ({labels.mean():.0%} anomalous), encoder: {encoder.name}")
+    print(f"{'projection':<12} {'dims':>5} {'fit s':>7} {'score us/log':>13} {'ROC AUC':>8}")
+    print("-" * 50)
+
+    for method, dim in SETTINGS:
+        start = time.perf_counter()
+        projection = None
+        train_emb = embeddings[:split]
+        if method != "none":
+            projection = EmbeddingProjection(method, dim).fit(train_emb)
+            train_emb = projection.transform(train_emb)
+        model = IForest(contamination=0.1, random_state=42)
+        model.fit(np.column_stack([train_emb, extra[:split]]))
+        fit_s = time.perf_counter() - start
+
+        # Time the inference path: projection plus decision_function
+        test_emb = embeddings[split:]
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            projected = projection.transform(test_emb) if projection is not None else test_emb
+            scores = model.decision_function(np.column_stack([projected, extra[split:]]))
+            best = min(best, time.perf_counter() - start)
+
+        auc = roc_auc_score(labels[split:], scores)
+        dims = train_emb.shape[1] + extra.shape[1]
+        print(f"{method:<12} {dims:>5} {fit_s:>7.2f} {best / len(test_emb) * 1e6:>13.1f} {auc:>8.3f}")
+
+if __name__ == "__main__":
+    main()
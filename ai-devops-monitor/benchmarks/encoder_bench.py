@@ -0,0 +1,121 @@
+"""
+Parity check and CPU benchmark for the anomaly-detection encoder backends
+
+Each backend runs in its own subprocess so resident memory is measured
+separately. Embeddings of the same generated messages are compared with
+the sentence-transformers (PyTorch) reference by cosine similarity.
+
+Usage (from the ai-devops-monitor directory):
+    python benchmarks/encoder_bench.py [num_messages] [onnx_model_path]
+"""
+import os
+import sys
+import json
+import time
+import random
+import resource
+import subprocess
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_ONNX_PATH = "app/models/minilm-onnx/model_int8.onnx"
+MIN_COSINE = 0.98
+
+def rss_mb():
+    """Current resident set size in MB"""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def worker(backend, count, onnx_path, output):
+    """Load one backend, embed the messages, report timings and memory"""
+    from generate_logs import generate_log
+    from app.utils.preprocess import clean_message
+    from app.services.encoders import OnnxEncoder, SentenceTransformerEncoder
+
+    random.seed(42)
+    now = datetime.utcnow()
+    messages = [clean_message(generate_log(i, now)["message"]) for i in range(count)]
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    if backend == "onnx":
+        encoder = OnnxEncoder(onnx_path)
+    else:
+        encoder = SentenceTransformerEncoder()
+    load_s = time.perf_counter() - start
+    loaded = rss_mb()
+
+    encoder.encode(messages[:32])
+    start = time.perf_counter()
+    embeddings = encoder.encode(messages)
+    encode_s = time.perf_counter() - start
+
+    single = messages[:200]
+    start = time.perf_counter()
+    for message in single:
+        encoder.encode([message])
+    single_ms = (time.perf_counter() - start) / len(single) * 1000
+
+    np.save(output, embeddings)
+    print(json.dumps({
+        "backend": backend,
+        "load_s": load_s,
+        "model_rss_mb": loaded - baseline,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "msgs_per_s": len(messages) / encode_s,
+        "single_ms": single_ms
+    }))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    onnx_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_ONNX_PATH
+
+    results = {}
+    embeddings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in ("sentence-transformers", "onnx"):
+            output = os.path.join(tmp, f"{backend}.npy")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", backend, str(count), onnx_path, output],
+                cwd=ROOT, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr.strip().splitlines()[-1]}")
+                continue
+            results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            embeddings[backend] = np.load(output)
+
+    print(f"{count} messages, CPU")
+    print(f"{'backend':<22} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'msg/s':>8} {'1-msg ms':>9}")
+    print("-" * 68)
+    for backend, r in results.items():
+        print(
+            f"{backend:<22} {r['load_s']:>7.1f} {r['model_rss_mb']:>9.0f} {r['peak_rss_mb']:>8.0f} "
+            f"{r['msgs_per_s']:>8.0f} {r['single_ms']:>9.2f}"
+        )
+
+    if len(embeddings) == 2:
+        reference, candidate = embeddings["sentence-transformers"], embeddings["onnx"]
+        cosine = np.sum(reference * candidate, axis=1) / (
+            np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+        )
+        verdict = "PASS" if cosine.min() >= MIN_COSINE else "FAIL"
+        print("-" * 68)
+        print(
+            f"parity vs sentence-transformers: mean cosine {cosine.mean():.4f}, "
+            f"min {cosine.min():.4f} ({verdict}, threshold {MIN_COSINE})"
+        )
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], int(sys.argv[3]), sys.argv[4], sys.argv[5])
+    else:
+        main()
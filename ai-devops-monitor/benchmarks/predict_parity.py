@@ -0,0 +1,47 @@
+"""
+Parity check for fleet-wide failure prediction
+
+For each service that logged in the last hour, builds the feature row
+the way /analysis/predict does (search_logs for the service) and the way
+/analysis/predict/all does (one _msearch for every service), and exits
+non-zero if any row differs.
+
+Usage (from the ai-devops-monitor directory, with OpenSearch running):
+    python benchmarks/predict_parity.py [hours]
+"""
+import asyncio
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routes.analysis import PREDICT_LOG_WINDOW, PREDICT_FIELDS
+from app.services.opensearch_client import opensearch_client
+from app.services.predictor import predictor
+
+async def main():
+    hours = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    if not await opensearch_client.connect():
+        sys.exit("OpenSearch is not reachable")
+    try:
+        services = await opensearch_client.get_active_services(hours=hours)
+        fleet = await opensearch_client.search_logs_by_service(
+            services, limit=PREDICT_LOG_WINDOW, fields=list(PREDICT_FIELDS)
+        )
+        mismatches = 0
+        for service in services:
+            logs = await opensearch_client.search_logs(limit=PREDICT_LOG_WINDOW, service=service)
+            single = predictor._extract_features(logs)
+            batched = predictor._extract_features(fleet.get(service, []))
+            if not np.array_equal(single, batched):
+                mismatches += 1
+                print(f"{service}: /predict {single.ravel().tolist()} != /predict/all {batched.ravel().tolist()}")
+        print(f"{len(services)} services, {mismatches} with differing features")
+    finally:
+        await opensearch_client.close()
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
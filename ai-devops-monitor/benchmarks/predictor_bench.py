@@ -0,0 +1,63 @@
+"""
+Microbenchmark for failure-prediction inference
+
+Compares per-call latency of the previous path (build an xgb.DMatrix and
+call Booster.predict) against Booster.inplace_predict on a contiguous
+float32 array, for several batch sizes and thread counts.
+
+Usage (from the ai-devops-monitor directory):
+    python benchmarks/predictor_bench.py [calls_per_case]
+"""
+import sys
+import time
+import numpy as np
+import xgboost as xgb
+
+NUM_FEATURES = 10
+
+def train_model(rows=5000):
+    rng = np.random.default_rng(42)
+    X = rng.random((rows, NUM_FEATURES)).astype(np.float32)
+    y = (X[:, 3] * 0.6 + X[:, 7] * 0.4 + rng.normal(0, 0.1, rows) > 0.5).astype(int)
+    params = {
+        'max_depth': 6,
+        'eta': 0.3,
+        'objective': 'binary:logistic',
+        'eval_metric': 'logloss'
+    }
+    return xgb.train(params, xgb.DMatrix(X, label=y), num_boost_round=100)
+
+def dmatrix_predict(model, features):
+    return model.predict(xgb.DMatrix(features))
+
+def inplace_predict(model, features):
+    return model.inplace_predict(np.ascontiguousarray(features, dtype=np.float32))
+
+def run(predict, model, features, calls):
+    predict(model, features)
+    start = time.perf_counter()
+    for _ in range(calls):
+        predict(model, features)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    model = train_model()
+    rng = np.random.default_rng(0)
+
+    sample = rng.random((64, NUM_FEATURES))
+    assert np.allclose(dmatrix_predict(model, sample), inplace_predict(model, sample), atol=1e-6)
+
+    print(f"{'rows':>6} {'nthread':>8} {'dmatrix us':>12} {'inplace us':>12} {'speedup':>8}")
+    print("-" * 50)
+    for nthread in (1, 4):
+        model.set_param({"nthread": nthread})
+        for rows in (1, 16, 256):
+            # The old path received float64 rows from np.array
+            features = rng.random((rows, NUM_FEATURES))
+            legacy = run(dmatrix_predict, model, features, calls)
+            current = run(inplace_predict, model, features, calls)
+            print(f"{rows:>6} {nthread:>8} {legacy:>12.1f} {current:>12.1f} {legacy / current:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Microbenchmark for message cleaning, field extraction and timestamps
+
+Compares the precompiled FieldExtractor against the previous
+per-pattern re.findall implementation on generated log messages,
+and the format-caching timestamp normalizer against strptime trial
+and error.
+
+Usage (from the ai-devops-monitor directory):
+    python benchmarks/preprocess_bench.py [num_messages]
+"""
+import os
+import re
+import sys
+import time
+import random
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_logs import generate_log
+from app.utils.preprocess import clean_message, extract_fields
+from app.utils.timestamps import timestamp_normalizer
+
+def legacy_clean_message(message):
+    message = re.sub(r'\s+', ' ', message)
+    message = message.strip()
+    message = re.sub(r'\x1b\[[0-9;]*m', '', message)
+    return message
+
+def legacy_extract_fields(message):
+    fields = {}
+    ips = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', message)
+    if ips:
+        fields["ip_addresses"] = ips
+    urls = re.findall(r'https?://[^\s]+', message)
+    if urls:
+        fields["urls"] = urls
+    error_codes = re.findall(r'\b[4-5]\d{2}\b', message)
+    if error_codes:
+        fields["http_status_codes"] = error_codes
+    if "Traceback" in message or "Exception" in message:
+        fields["has_stacktrace"] = True
+    durations = re.findall(r'(\d+(?:\.\d+)?)\s*(ms|sec|seconds?|minutes?)', message.lower())
+    if durations:
+        fields["durations"] = [f"{d[0]}{d[1]}" for d in durations]
+    return fields
+
+def legacy_normalize_timestamp(timestamp):
+    formats = [
+        "%Y-%m-%dT%H:%M:%S.%fZ",
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S",
+        "%d/%b/%Y:%H:%M:%S",
+    ]
+    for fmt in formats:
+        try:
+            return datetime.strptime(timestamp, fmt).isoformat()
+        except ValueError:
+            continue
+    return timestamp
+
+def run_timestamps(label, normalize, values, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        normalize(values)
+        best = min(best, time.perf_counter() - start)
+    rate = len(values) / best
+    print(f"{label:<10} {best * 1000:9.1f} ms  {rate:12,.0f} ts/s")
+    return rate
+
+def run(label, clean, extract, messages, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            extract(clean(message))
+        best = min(best, time.perf_counter() - start)
+    rate = len(messages) / best
+    print(f"{label:<10} {best * 1000:9.1f} ms  {rate:12,.0f} msg/s")
+    return rate
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(42)
+    now = datetime.utcnow()
+    messages = [generate_log(i, now)["message"] for i in range(count)]
+
+    # Parity on generated logs plus messages where fields overlap
+    messages += [
+        "GET http://10.0.0.1:8080/api/500 failed",
+        "upstream 10.2.3.4 returned 503 after 500 ms",
+        "Timeout after 2.5 Seconds calling https://svc.local/v1/404?retry=1",
+        "java.lang.NullPointerException at 192.168.0.450 took 12MS",
+    ]
+    mismatches = [
+        m for m in messages
+        if legacy_clean_message(m) != clean_message(m)
+        or legacy_extract_fields(legacy_clean_message(m)) != extract_fields(clean_message(m))
+    ]
+    print(f"{len(messages)} messages, {len(mismatches)} with differing output")
+    if mismatches:
+        m = mismatches[0]
+        print(f"first mismatch: {m!r}")
+        print(f"  legacy:  {legacy_extract_fields(legacy_clean_message(m))}")
+        print(f"  current: {extract_fields(clean_message(m))}")
+        sys.exit(1)
+    print("-" * 44)
+
+    legacy = run("legacy", legacy_clean_message, legacy_extract_fields, messages)
+    current = run("current", clean_message, extract_fields, messages)
+
+    print("-" * 44)
+    print(f"speedup: {current / legacy:.2f}x")
+
+    timestamps = [generate_log(i, now)["timestamp"] for i in range(count)]
+    print()
+    print(f"{count} timestamps")
+    print("-" * 44)
+    legacy = run_timestamps("legacy", lambda vs: [legacy_normalize_timestamp(v) for v in vs], timestamps)
+    current = run_timestamps("current", timestamp_normalizer.normalize_many, timestamps)
+    print("-" * 44)
+    print(f"speedup: {current / legacy:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Export all-MiniLM-L6-v2 to ONNX and quantize it to int8 for ENCODER_BACKEND=onnx
+
+Needs torch and transformers (installed with sentence-transformers) plus onnx:
+    pip install -r requirements-export.txt
+Writes model.onnx, model_int8.onnx and tokenizer.json to the output directory.
+
+Usage (from the ai-devops-monitor directory):
+    python export_encoder.py [output_dir]
+"""
+import os
+import sys
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_OUTPUT = "app/models/minilm-onnx"
+
+def export(output_dir):
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, "model_int8.onnx")
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModel.from_pretrained(MODEL_NAME)
+    model.eval()
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in sample}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample.values()),
+            fp32_path,
+            input_names=list(sample.keys()),
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14
+        )
+    print(f"Exported {fp32_path}")
+
+    # Dynamic quantization: int8 weights, activations quantized at run time
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"Quantized {int8_path}")
+
+    # The fast tokenizer writes tokenizer.json, which OnnxEncoder loads
+    tokenizer.save_pretrained(output_dir)
+
+    for path in (fp32_path, int8_path):
+        print(f"  {os.path.basename(path)}: {os.path.getsize(path) / 1e6:.1f} MB")
+    print(f"Set ENCODER_BACKEND=onnx and ENCODER_ONNX_PATH={int8_path}")
+    print("Check parity with: python benchmarks/encoder_bench.py")
+
+if __name__ == "__main__":
+    export(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT)
@@ -1,11 +1,17 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Sparkles, Send, Loader, AlertTriangle, Lightbulb, CheckCircle, Target, Shield } from 'lucide-react';
 
-const RCABox = ({ logs, onAnalyze }) => {
+const RCABox = ({ logs, onAnalyze, onAnalyzeStream }) => {
   const [selectedLogs, setSelectedLogs] = useState([]);
   const [context, setContext] = useState('');
   const [analysis, setAnalysis] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
+  const [error, setError] = useState(null);
+  const abortRef = useRef(null);
+
+  // Stop an in-flight stream when the component unmounts
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   const toggleLogSelection = (logId) => {
     setSelectedLogs(prev => 
@@ -19,16 +25,59 @@ const RCABox = ({ logs, onAnalyze }) => {
     if (selectedLogs.length === 0) return;
     
     setLoading(true);
+    setError(null);
+    if (onAnalyzeStream) {
+      await handleAnalyzeStream();
+      return;
+    }
     try {
       const result = await onAnalyze(selectedLogs, context);
       setAnalysis(result);
     } catch (error) {
       console.error('Analysis failed:', error);
+      setError(error.response?.data?.detail || error.message || 'Analysis failed');
     } finally {
       setLoading(false);
     }
   };
 
+  // Render tokens as the LLM produces them instead of waiting for the full answer
+  const handleAnalyzeStream = async () => {
+    abortRef.current?.abort();
+    const controller = new AbortController();
+    abortRef.current = controller;
+    let text = '';
+
+    try {
+      await onAnalyzeStream(selectedLogs, context, {
+        meta: (meta) => {
+          setAnalysis({ analysis: '', logs_analyzed: meta.logs_analyzed, missing_ids: meta.missing_ids, cached: meta.cached });
+          setStreaming(true);
+          setLoading(false);
+        },
+        token: ({ text: chunk }) => {
+          text += chunk;
+          setAnalysis(prev => ({ ...prev, analysis: text }));
+        },
+        error: ({ detail }) => {
+          console.error('Analysis failed:', detail);
+          setError(detail || 'Analysis failed');
+        },
+      }, controller.signal);
+    } catch (error) {
+      if (error.name !== 'AbortError') {
+        console.error('Analysis failed:', error);
+        setError(error.message || 'Analysis failed');
+      }
+    } finally {
+      // A newer request may have replaced this one
+      if (abortRef.current === controller) {
+        setLoading(false);
+        setStreaming(false);
+      }
+    }
+  };
+
   return (
     <div className="space-y-6">
       {/* Log Selection */}
@@ -117,6 +166,19 @@ const RCABox = ({ logs, onAnalyze }) => {
         </div>
       </div>
 
+      {/* Analysis Error; a partial streamed analysis stays visible below */}
+      {error && (
+        <div className="card border-l-4 border-red-500">
+          <div className="flex items-start space-x-3">
+            <AlertTriangle className="h-6 w-6 text-red-400 flex-shrink-0" />
+            <div>
+              <h4 className="font-bold text-red-400">Analysis failed</h4>
+              <p className="text-sm text-gray-300 mt-1">{error}</p>
+            </div>
+          </div>
+        </div>
+      )}
+
       {/* Analysis Result */}
       {analysis && (
         <div className="card border-l-4 border-primary-500 relative overflow-hidden">
@@ -131,16 +193,33 @@ const RCABox = ({ logs, onAnalyze }) => {
                 </div>
                 <h3 className="text-2xl font-bold text-gray-100">AI Analysis Results</h3>
               </div>
-              <div className="flex items-center space-x-2 text-sm bg-primary-900 bg-opacity-30 px-4 py-2 rounded-full border border-primary-700">
-                <Send className="h-4 w-4 text-primary-400" />
-                <span className="text-primary-400 font-semibold">{analysis.logs_analyzed || selectedLogs.length}</span>
-                <span className="text-gray-300">logs analyzed</span>
+              <div className="flex items-center space-x-2">
+                {streaming && (
+                  <span className="flex items-center text-xs text-primary-400 bg-gray-700 px-3 py-1 rounded-full border border-gray-600">
+                    <Loader className="h-3 w-3 animate-spin mr-1" />
+                    generating
+                  </span>
+                )}
+                {analysis.cached && (
+                  <span className="text-xs text-gray-400 bg-gray-700 px-3 py-1 rounded-full border border-gray-600">cached</span>
+                )}
+                {analysis.missing_ids?.length > 0 && (
+                  <span className="text-xs text-yellow-400 bg-gray-700 px-3 py-1 rounded-full border border-gray-600">
+                    {analysis.missing_ids.length} not found
+                  </span>
+                )}
+                <div className="flex items-center space-x-2 text-sm bg-primary-900 bg-opacity-30 px-4 py-2 rounded-full border border-primary-700">
+                  <Send className="h-4 w-4 text-primary-400" />
+                  <span className="text-primary-400 font-semibold">{analysis.logs_analyzed || selectedLogs.length}</span>
+                  <span className="text-gray-300">logs analyzed</span>
+                </div>
               </div>
             </div>
 
             <div className="space-y-6">
               {(() => {
-                const analysisText = analysis.analysis || analysis;
+                // Streamed results start empty and fill in token by token
+                const analysisText = typeof analysis === 'string' ? analysis : (analysis.analysis ?? '');
                 const sections = {
                   summary: '',
                   rootCauses: '',
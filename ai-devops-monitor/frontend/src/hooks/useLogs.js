@@ -1,7 +1,9 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { logsAPI } from '../utils/api';
+import { useWebSocket } from './useWebSocket';
 
-export const useLogs = (autoRefresh = false, interval = 5000) => {
+// live: load once, then receive new logs pushed over /ws/logs instead of polling
+export const useLogs = ({ live = false, autoRefresh = false, interval = 5000 } = {}) => {
   const [logs, setLogs] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -40,6 +42,32 @@ export const useLogs = (autoRefresh = false, interval = 5000) => {
     fetchLogs();
   }, [fetchLogs]);
 
+  // Newest first, deduplicated against what is already shown, capped at the page size
+  const handleLiveMessage = useCallback((message) => {
+    if (message.type !== 'logs') return;
+    const incoming = message.logs.slice().reverse();
+    const ids = new Set(incoming.map((log) => log._id));
+    setLogs((prev) => [...incoming, ...prev.filter((log) => !ids.has(log._id))].slice(0, filters.limit));
+  }, [filters.limit]);
+
+  const { isConnected } = useWebSocket(
+    live ? logsAPI.liveTailUrl({ level: filters.level }) : null,
+    handleLiveMessage
+  );
+
+  // After a reconnect, reload to pick up logs pushed while disconnected
+  const wasConnected = useRef(false);
+  const hasConnected = useRef(false);
+  useEffect(() => {
+    if (isConnected && !wasConnected.current && hasConnected.current) {
+      fetchLogs();
+    }
+    if (isConnected) {
+      hasConnected.current = true;
+    }
+    wasConnected.current = isConnected;
+  }, [isConnected, fetchLogs]);
+
   useEffect(() => {
     if (autoRefresh) {
       const intervalId = setInterval(fetchLogs, interval);
@@ -55,5 +83,6 @@ export const useLogs = (autoRefresh = false, interval = 5000) => {
     searchLogs,
     filters,
     setFilters,
+    isLive: isConnected,
   };
 };
@@ -7,6 +7,10 @@ export const useWebSocket = (url, onMessage) => {
   const reconnectTimeout = useRef(null);
 
   const connect = useCallback(() => {
+    // No URL: stay disconnected
+    if (!url) {
+      return;
+    }
     try {
       ws.current = new WebSocket(url);
 
@@ -47,7 +51,11 @@ export const useWebSocket = (url, onMessage) => {
       clearTimeout(reconnectTimeout.current);
     }
     if (ws.current) {
+      // Closing on purpose: don't schedule a reconnect
+      ws.current.onclose = null;
       ws.current.close();
+      ws.current = null;
+      setIsConnected(false);
     }
   }, []);
 
@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Activity, AlertTriangle, TrendingUp, Server, Database, Zap } from 'lucide-react';
-import { logsAPI, analysisAPI, healthAPI } from '../utils/api';
+import { analysisAPI, healthAPI } from '../utils/api';
 import { useFetch } from '../hooks/useFetch';
 import { Line, Doughnut } from 'react-chartjs-2';
 import {
@@ -37,34 +37,30 @@ const Dashboard = () => {
     services: 0
   });
 
-  const { data: logs, loading: logsLoading } = useFetch(() => logsAPI.getAll({ limit: 100 }), []);
-  const { data: anomalyData } = useFetch(() => analysisAPI.getAnomalies(100), []);
+  // Counts are aggregated server-side across the whole index, not from a page of logs
+  const { data: summary, loading: summaryLoading } = useFetch(() => analysisAPI.getSummary(24), []);
+  const { data: anomalyData } = useFetch(() => analysisAPI.getAnomalies(5), []);
   const { data: healthData } = useFetch(() => healthAPI.check(), []);
 
+  const levelCount = (level) => summary?.levels?.[level] || 0;
+
   useEffect(() => {
-    if (logs?.logs) {
-      const logList = logs.logs;
+    if (summary) {
       setStats({
-        totalLogs: logList.length,
-        errors: logList.filter(l => l.level === 'ERROR' || l.level === 'CRITICAL').length,
-        warnings: logList.filter(l => l.level === 'WARNING').length,
-        anomalies: anomalyData?.anomalies_detected || 0,
-        services: new Set(logList.map(l => l.service)).size
+        totalLogs: summary.total_logs,
+        errors: levelCount('ERROR') + levelCount('CRITICAL'),
+        warnings: levelCount('WARNING'),
+        anomalies: summary.anomalies,
+        services: summary.services.length
       });
     }
-  }, [logs, anomalyData]);
+  }, [summary]);
 
   // Level distribution chart data
   const levelData = {
     labels: ['Debug', 'Info', 'Warning', 'Error', 'Critical'],
     datasets: [{
-      data: logs?.logs ? [
-        logs.logs.filter(l => l.level === 'DEBUG').length,
-        logs.logs.filter(l => l.level === 'INFO').length,
-        logs.logs.filter(l => l.level === 'WARNING').length,
-        logs.logs.filter(l => l.level === 'ERROR').length,
-        logs.logs.filter(l => l.level === 'CRITICAL').length,
-      ] : [0, 0, 0, 0, 0],
+      data: ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'].map(levelCount),
       backgroundColor: [
         'rgba(156, 163, 175, 0.8)',
         'rgba(59, 130, 246, 0.8)',
@@ -127,6 +123,43 @@ const Dashboard = () => {
     }
   };
 
+  // Error rate timeline chart data
+  const timeline = summary?.timeline || [];
+  const errorRateData = {
+    labels: timeline.map(b => new Date(b.timestamp).toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })),
+    datasets: [{
+      label: 'Error rate (%)',
+      data: timeline.map(b => +(b.error_rate * 100).toFixed(2)),
+      borderColor: 'rgba(239, 68, 68, 1)',
+      backgroundColor: 'rgba(239, 68, 68, 0.15)',
+      fill: true,
+      tension: 0.3,
+      pointRadius: 0,
+    }]
+  };
+
+  const lineOptions = {
+    maintainAspectRatio: false,
+    plugins: {
+      legend: { display: false },
+      tooltip: {
+        backgroundColor: 'rgba(31, 41, 55, 0.95)',
+        titleColor: 'rgb(243, 244, 246)',
+        bodyColor: 'rgb(209, 213, 219)',
+        callbacks: {
+          afterLabel: (context) => {
+            const bucket = timeline[context.dataIndex];
+            return bucket ? `${bucket.errors} of ${bucket.total} logs` : '';
+          }
+        }
+      }
+    },
+    scales: {
+      x: { ticks: { color: 'rgb(156, 163, 175)', maxTicksLimit: 12 }, grid: { color: 'rgba(55, 65, 81, 0.5)' } },
+      y: { beginAtZero: true, ticks: { color: 'rgb(156, 163, 175)' }, grid: { color: 'rgba(55, 65, 81, 0.5)' } }
+    }
+  };
+
   const StatCard = ({ icon: Icon, title, value, color, trend }) => (
     <div className="group card hover:shadow-xl transition-all duration-300 hover:-translate-y-1 relative overflow-hidden">
       {/* Gradient Background Accent */}
@@ -219,15 +252,15 @@ const Dashboard = () => {
             </div>
             <div className="flex items-center space-x-2 text-sm text-gray-400 bg-gray-700 bg-opacity-50 px-4 py-2 rounded-full border border-gray-600">
               <Activity className="h-4 w-4" />
-              <span className="font-semibold">{logs?.logs?.length || 0}</span>
-              <span>logs</span>
+              <span className="font-semibold">{(summary?.total_logs || 0).toLocaleString()}</span>
+              <span>logs (24h)</span>
             </div>
           </div>
           
           <div className="h-96 flex items-center justify-center relative">
-            {!logsLoading && logs?.logs?.length > 0 ? (
+            {!summaryLoading && summary?.total_logs > 0 ? (
               <Doughnut data={levelData} options={chartOptions} />
-            ) : logsLoading ? (
+            ) : summaryLoading ? (
               <div className="flex flex-col items-center gap-3">
                 <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-primary-500"></div>
                 <p className="text-gray-400 text-sm">Loading data...</p>
@@ -247,7 +280,7 @@ const Dashboard = () => {
           <div className="mt-8 pt-6 border-t border-gray-700">
             <div className="grid grid-cols-5 gap-3">
               {['Debug', 'Info', 'Warning', 'Error', 'Critical'].map((level, idx) => {
-                const count = logs?.logs ? logs.logs.filter(l => l.level === level.toUpperCase()).length : 0;
+                const count = levelCount(level.toUpperCase());
                 const colors = [
                   { bg: 'bg-gray-700', text: 'text-gray-400', border: 'border-gray-600' },
                   { bg: 'bg-blue-900 bg-opacity-20', text: 'text-blue-400', border: 'border-blue-700' },
@@ -268,6 +301,24 @@ const Dashboard = () => {
         </div>
       </div>
 
+      {/* Error Rate Timeline */}
+      {timeline.length > 0 && (
+        <div className="card">
+          <div className="flex items-center justify-between mb-6">
+            <div className="flex items-center gap-3">
+              <div className="h-10 w-1.5 bg-gradient-to-b from-danger-400 via-danger-500 to-danger-600 rounded-full"></div>
+              <div>
+                <h2 className="text-2xl font-bold text-gray-100">Error Rate</h2>
+                <p className="text-sm text-gray-400 mt-1">ERROR and CRITICAL share of logs, last 24 hours</p>
+              </div>
+            </div>
+          </div>
+          <div className="h-64">
+            <Line data={errorRateData} options={lineOptions} />
+          </div>
+        </div>
+      )}
+
       {/* Recent Anomalies */}
       {anomalyData?.anomalies && anomalyData.anomalies.length > 0 && (
         <div className="card border-l-4 border-danger-500 relative overflow-hidden">
@@ -3,13 +3,19 @@ import { useLogs } from '../hooks/useLogs';
 import LogTable from '../components/LogTable';
 
 const Logs = () => {
-  const { logs, loading, fetchLogs, filters, setFilters } = useLogs(true, 10000);
+  const { logs, loading, fetchLogs, isLive } = useLogs({ live: true });
 
   return (
     <div>
-      <div className="mb-6">
-        <h1 className="text-3xl font-bold text-gray-100">Logs</h1>
-        <p className="text-gray-400 mt-1">View and search system logs in real-time</p>
+      <div className="mb-6 flex items-start justify-between">
+        <div>
+          <h1 className="text-3xl font-bold text-gray-100">Logs</h1>
+          <p className="text-gray-400 mt-1">View and search system logs in real-time</p>
+        </div>
+        <span className={`flex items-center text-xs px-3 py-1 rounded-full border border-gray-600 bg-gray-700 ${isLive ? 'text-green-400' : 'text-gray-400'}`}>
+          <span className={`h-2 w-2 rounded-full mr-2 ${isLive ? 'bg-green-400 animate-pulse' : 'bg-gray-500'}`} />
+          {isLive ? 'Live' : 'Connecting...'}
+        </span>
       </div>
 
       <LogTable logs={logs} loading={loading} onRefresh={fetchLogs} />
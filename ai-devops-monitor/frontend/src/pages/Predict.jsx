@@ -6,6 +6,7 @@ import { useLogs } from '../hooks/useLogs';
 
 const Predict = () => {
   const [prediction, setPrediction] = useState(null);
+  const [fleet, setFleet] = useState(null);
   const [loading, setLoading] = useState(false);
   const [selectedService, setSelectedService] = useState('all');
   const { logs } = useLogs();
@@ -16,8 +17,13 @@ const Predict = () => {
     setLoading(true);
     try {
       const service = selectedService === 'all' ? null : selectedService;
-      const result = await analysisAPI.predict(service);
+      // Fleet ranking comes from one aggregation request instead of one call per service
+      const [result, ranking] = await Promise.all([
+        analysisAPI.predict(service),
+        service ? Promise.resolve(null) : analysisAPI.predictAll(),
+      ]);
       setPrediction(result);
+      setFleet(ranking);
     } catch (error) {
       console.error('Prediction failed:', error);
     } finally {
@@ -30,6 +36,9 @@ const Predict = () => {
     return result;
   };
 
+  const handleRCAStream = (logIds, context, handlers, signal) =>
+    analysisAPI.streamRCA(logIds, context, handlers, signal);
+
   return (
     <div className="space-y-6">
       <div>
@@ -69,8 +78,32 @@ const Predict = () => {
         />
       )}
 
+      {/* Fleet Risk Ranking */}
+      {fleet?.predictions?.length > 0 && selectedService === 'all' && (
+        <div className="card">
+          <h2 className="text-xl font-bold mb-4">Service Risk Ranking</h2>
+          <p className="text-sm text-gray-400 mb-4">
+            {fleet.services_analyzed} services, last {fleet.hours}h
+          </p>
+          <div className="space-y-2">
+            {fleet.predictions.map(item => (
+              <div key={item.service} className="flex items-center justify-between p-3 border border-gray-700 rounded-lg">
+                <span className="font-semibold text-gray-200">{item.service}</span>
+                <div className="flex items-center gap-4 text-sm">
+                  <span className="text-gray-400">{item.features.error_count} / {item.features.total_logs} errors</span>
+                  <span className={`badge ${item.prediction === 'high_risk' ? 'badge-error' : item.prediction === 'medium_risk' ? 'badge-warning' : 'badge-info'}`}>
+                    {item.prediction.replace('_', ' ')}
+                  </span>
+                  <span className="font-bold text-gray-100 w-14 text-right">{(item.probability * 100).toFixed(0)}%</span>
+                </div>
+              </div>
+            ))}
+          </div>
+        </div>
+      )}
+
       {/* Root Cause Analysis */}
-      <RCABox logs={logs} onAnalyze={handleRCA} />
+      <RCABox logs={logs} onAnalyze={handleRCA} onAnalyzeStream={handleRCAStream} />
     </div>
   );
 };
@@ -19,8 +19,22 @@ const Settings = () => {
     setLoading(true);
     setTestResult(null);
     try {
-      const result = await alertsAPI.sendTest();
-      setTestResult({ success: true, message: 'Test alert sent successfully!' });
+      const queued = await alertsAPI.sendTest();
+      // Alerts are delivered in the background; poll until the outbox settles
+      let record = queued;
+      for (let i = 0; i < 15 && !['delivered', 'failed', 'skipped'].includes(record.status); i++) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        record = await alertsAPI.getStatus(queued.alert_id);
+      }
+      const messages = {
+        delivered: 'Test alert sent successfully!',
+        failed: 'Failed to send test alert',
+        skipped: 'No alert channels are configured',
+      };
+      setTestResult({
+        success: record.status === 'delivered',
+        message: messages[record.status] || 'Test alert queued, still retrying delivery',
+      });
     } catch (error) {
       setTestResult({ success: false, message: 'Failed to send test alert' });
     } finally {
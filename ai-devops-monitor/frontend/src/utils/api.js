@@ -1,6 +1,7 @@
 import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
 
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -29,17 +30,69 @@ api.interceptors.response.use(
   }
 );
 
+// POST a JSON body and dispatch Server-Sent Events to handlers[eventName](data)
+// axios cannot read a response body incrementally in the browser, so this uses fetch
+const streamSSE = async (path, body, handlers = {}, signal) => {
+  const response = await fetch(`${API_BASE_URL}${path}`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      const data = [];
+      raw.split('\n').forEach(line => {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+      });
+      if (handlers[event]) handlers[event](data.length ? JSON.parse(data.join('\n')) : null);
+    }
+  }
+};
+
 // API endpoints
 export const logsAPI = {
   getAll: (params) => api.get('/logs/', { params }),
   search: (query, limit = 50) => api.get('/logs/search', { params: { query, limit } }),
   create: (log) => api.post('/logs/', log),
+  // WebSocket URL for the live tail; level and service filter server-side
+  liveTailUrl: ({ level, service } = {}) => {
+    const params = new URLSearchParams();
+    if (level) params.set('level', level);
+    if (service) params.set('service', service);
+    const query = params.toString();
+    return `${WS_BASE_URL}/ws/logs${query ? `?${query}` : ''}`;
+  },
 };
 
 export const analysisAPI = {
   getAnomalies: (limit = 100) => api.get('/analysis/anomalies', { params: { limit } }),
+  getSummary: (hours = 24, service) => api.get('/analysis/summary', { params: { hours, service } }),
   predict: (service) => api.get('/analysis/predict', { params: { service } }),
-  performRCA: (logIds, context = '') => api.post('/analysis/rca', { log_ids: logIds, context }),
+  predictAll: (hours = 1) => api.get('/analysis/predict/all', { params: { hours } }),
+  // LLM generation takes longer than the default timeout
+  performRCA: (logIds, context = '') => api.post('/analysis/rca', { log_ids: logIds, context }, { timeout: 120000 }),
+  streamRCA: (logIds, context = '', handlers = {}, signal) => streamSSE('/analysis/rca/stream', { log_ids: logIds, context }, handlers, signal),
   batchAnalyze: () => api.post('/analysis/batch-analyze'),
 };
 
@@ -48,6 +101,8 @@ export const alertsAPI = {
   send: (alert) => api.post('/alerts/send', alert),
   sendAnomaly: (logId, score) => api.post('/alerts/anomaly', null, { params: { log_id: logId, anomaly_score: score } }),
   sendFailure: (service, probability) => api.post('/alerts/failure', null, { params: { service, probability } }),
+  getStatus: (alertId) => api.get(`/alerts/${alertId}`),
+  getOutbox: () => api.get('/alerts/outbox'),
 };
 
 export const healthAPI = {